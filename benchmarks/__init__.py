@@ -0,0 +1,3 @@
+"""
+Reproducible benchmarks for the GA solvers; see benchmarks.bench.
+"""
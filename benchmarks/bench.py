@@ -0,0 +1,202 @@
+"""
+Benchmark harness for the GA solvers.
+
+Every case runs on a fixed seed in a fresh process so peak RSS is measured per
+case. Results (wall time, generations/sec, peak RSS, final solution cost) are
+written to JSON and can be compared against a stored baseline:
+
+    python -m benchmarks.bench --quick --output bench.json
+    python -m benchmarks.bench --baseline bench.json --output new.json
+
+From another directory, run the file itself (python path/to/benchmarks/bench.py).
+
+The comparison exits with status 1 when a case loses more than
+--max-slowdown of its throughput or its cost gets worse by more than
+--max-quality-loss. Costs are lower-is-better for every solver (TSP tour
+length, string mismatches, negated TV rating).
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import random
+import resource
+import string
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+# data paths in the grids are relative to the repository root, so case names
+# stay the same wherever the harness is run from; the root also goes on
+# sys.path so the ga package imports outside of it
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from ga.strings import StringGAConfig, island_string, solve_string  # noqa: E402
+from ga.tour import distance_matrix  # noqa: E402
+from ga.tsp import TSPConfig, island_tsp, solve_tsp  # noqa: E402
+from ga.tv import genetic_algorithm, island_schedule, read_csv_to_dict  # noqa: E402
+
+SEED = 42
+
+FULL_GRID = {
+    "tsp": [{"n_cities": n, "n_population": p, "n_generations": 20}
+            for n in (10, 100, 1000) for p in (250, 1000, 10000)],
+    "string": [{"target_len": n, "pop_size": p, "max_generations": 200, "engine": engine}
+               for engine in ("numpy", "python") for n in (4, 16, 64, 256) for p in (250, 1000)]
+    + [{"target_len": n, "pop_size": 10000, "max_generations": 200, "engine": "numpy"} for n in (256, 1024)],
+    "tv": [{"ratings": "pages/program_ratings.csv", "population_size": p, "generations": 100} for p in (50, 5000)],
+    "islands": [{"problem": problem, "n_islands": 4, "n_epochs": 10, "topology": topology}
+                for problem in ("tsp", "string", "tv") for topology in ("ring", "full")],
+}
+
+QUICK_GRID = {
+    "tsp": [{"n_cities": n, "n_population": p, "n_generations": 20} for n in (10, 100) for p in (250, 1000)],
+    "string": [{"target_len": n, "pop_size": 250, "max_generations": 100} for n in (4, 16, 64)],
+    "tv": [{"ratings": "pages/program_ratings.csv"}],
+    "islands": [{"problem": problem, "n_islands": 2, "n_epochs": 4} for problem in ("tsp", "string", "tv")],
+}
+
+
+def bench_tsp(n_cities, n_population, n_generations):
+    coords = np.random.default_rng(SEED).random((n_cities, 2)) * 100
+    config = TSPConfig(n_population=n_population, n_generations=n_generations, seed=SEED)
+    result = solve_tsp(coords, config)
+    return n_generations, result.length
+
+
+def bench_string(target_len, pop_size, max_generations, engine="numpy"):
+    target = "".join(random.Random(SEED).choice(string.ascii_letters + " ") for _ in range(target_len))
+    config = StringGAConfig(target, pop_size, max_generations=max_generations, seed=SEED, engine=engine)
+    result = solve_string(config)
+    return result.generations, result.fitness
+
+
+def bench_tv(ratings, population_size=50, generations=100):
+    ratings = read_csv_to_dict(os.path.join(REPO_ROOT, ratings))
+    schedule = genetic_algorithm(list(ratings), ratings, 0.8, 0.2, random.Random(SEED), population_size, generations)
+    total = sum(ratings[program][slot] for slot, program in enumerate(schedule))
+    return generations, -total
+
+
+def bench_islands(problem, n_islands, n_epochs, topology="ring", migration_interval=10):
+    # each island is the size of the default single-population case
+    settings = dict(n_islands=n_islands, n_epochs=n_epochs, migration_interval=migration_interval,
+                    topology=topology)
+    if problem == "tsp":
+        coords = np.random.default_rng(SEED).random((100, 2)) * 100
+        result = island_tsp(distance_matrix(coords), n_population=250, seed=SEED, **settings)
+    elif problem == "string":
+        target = "".join(random.Random(SEED).choice(string.ascii_letters + " ") for _ in range(64))
+        result = island_string(StringGAConfig(target, 250, seed=SEED), **settings)
+    else:
+        ratings = read_csv_to_dict(os.path.join(REPO_ROOT, "pages/program_ratings.csv"))
+        result = island_schedule(ratings, population_size=50, seed=SEED, **settings)
+    return n_epochs * migration_interval, result["best_cost"]
+
+
+SOLVERS = {"tsp": bench_tsp, "string": bench_string, "tv": bench_tv, "islands": bench_islands}
+
+
+def _peak_rss_bytes():
+    # the island model's workers have exited by now, so they count as children
+    peak = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+               resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    # kilobytes on Linux, bytes on macOS
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _run_case(solver, params, repeat):
+    # seeded runs are identical, so only the fastest repeat's time is kept
+    wall = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        generations, cost = SOLVERS[solver](**params)
+        wall = min(wall, time.perf_counter() - start)
+    return {
+        "wall_time": wall,
+        "generations": generations,
+        "generations_per_sec": generations / wall if wall > 0 else float("inf"),
+        "peak_rss": _peak_rss_bytes(),
+        "cost": float(cost),
+    }
+
+
+def case_name(solver, params):
+    return solver + "[" + ",".join(f"{key}={value}" for key, value in params.items()) + "]"
+
+
+def run_grid(grid, solvers=None, repeat=3):
+    """
+    Running every case of the grid, each in its own process, repeat times
+    Output:
+    Dict of case name -> measurements
+    """
+    results = {}
+    # executor workers may start processes of their own (the island model),
+    # unlike multiprocessing.Pool's daemonic ones
+    context = multiprocessing.get_context("spawn")
+    for solver, cases in grid.items():
+        if solvers and solver not in solvers:
+            continue
+        for params in cases:
+            name = case_name(solver, params)
+            with ProcessPoolExecutor(1, mp_context=context) as pool:
+                results[name] = pool.submit(_run_case, solver, params, repeat).result()
+            print(f"{name}: {results[name]['generations_per_sec']:.1f} gen/s, "
+                  f"cost {results[name]['cost']:.4g}, {results[name]['peak_rss'] / 2**20:.0f} MiB", flush=True)
+    return results
+
+
+def compare(results, baseline, max_slowdown=0.2, max_quality_loss=0.05):
+    """
+    Regressions of results against a baseline run
+    Output:
+    List of messages, empty if nothing regressed
+    """
+    regressions = []
+    for name, base in baseline.items():
+        if name not in results:
+            continue
+        current = results[name]
+        if current["generations_per_sec"] < base["generations_per_sec"] * (1 - max_slowdown):
+            regressions.append(f"{name}: throughput {current['generations_per_sec']:.1f} gen/s "
+                               f"vs baseline {base['generations_per_sec']:.1f}")
+        if current["cost"] - base["cost"] > max_quality_loss * abs(base["cost"]):
+            regressions.append(f"{name}: cost {current['cost']:.4g} vs baseline {base['cost']:.4g}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--quick", action="store_true", help="run the small grid")
+    parser.add_argument("--solver", action="append", choices=sorted(SOLVERS), help="only run these solvers")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per case; the fastest is kept")
+    parser.add_argument("--output", help="write results to this JSON file")
+    parser.add_argument("--baseline", help="compare against this JSON file")
+    parser.add_argument("--max-slowdown", type=float, default=0.2)
+    parser.add_argument("--max-quality-loss", type=float, default=0.05)
+    args = parser.parse_args(argv)
+
+    results = run_grid(QUICK_GRID if args.quick else FULL_GRID, args.solver, args.repeat)
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump({"machine": platform.platform(), "seed": SEED, "repeat": args.repeat, "results": results},
+                      file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)["results"]
+        regressions = compare(results, baseline, args.max_slowdown, args.max_quality_loss)
+        for message in regressions:
+            print("REGRESSION", message)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,37 @@
+"""
+Headless Fourier-domain image editing: spectra, masks and inverse
+transforms used by the Fourier Transform page.
+"""
+
+from fourier.engine import full_plane, half_mask, irfft_image, log_magnitude, masked_inverse, rfft_image, to_uint8
+from fourier.filters import FilterSpec, apply_gain, combine_gain, filter_gain, filtered_inverse, frequency_grid
+from fourier.masks import mask_bool, mask_from_canvas
+from fourier.pyramid import fit_for_display, png_bytes, preview_shape, resize_to, upscale_mask
+from fourier.spectrum import Spectrum, SpectrumCache, compute_spectrum, default_spectrum_cache
+
+__all__ = [
+    "FilterSpec",
+    "Spectrum",
+    "SpectrumCache",
+    "apply_gain",
+    "combine_gain",
+    "compute_spectrum",
+    "default_spectrum_cache",
+    "filter_gain",
+    "filtered_inverse",
+    "fit_for_display",
+    "frequency_grid",
+    "full_plane",
+    "half_mask",
+    "irfft_image",
+    "log_magnitude",
+    "mask_bool",
+    "mask_from_canvas",
+    "masked_inverse",
+    "png_bytes",
+    "preview_shape",
+    "resize_to",
+    "rfft_image",
+    "to_uint8",
+    "upscale_mask",
+]
@@ -0,0 +1,327 @@
+"""
+Headless batch Fourier filtering: every image in a directory, zip or tar
+archive goes through decode -> rfft -> filter gain -> irfft -> PNG, across a
+process pool:
+
+    python -m fourier.batch photos/ filtered/ --kind lowpass --profile gaussian --cutoff 0.05
+    python -m fourier.batch scans.zip filtered/ --kind notch --center 0,0.25 --mask mask.png
+
+The parent process only reads files and keeps at most --read-ahead of them in
+flight, so memory stays flat however many images there are. Each worker
+builds the filter gain (combined with the optional mask) once per image
+shape and writes its results straight to the output directory. The FFT
+plans themselves are cached per shape by scipy.fft / numpy.fft.
+"""
+import argparse
+import os
+import sys
+import tarfile
+import tempfile
+import time
+import zipfile
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Optional
+
+import cv2
+import numpy as np
+
+from fourier.engine import irfft_image, rfft_image, to_uint8
+from fourier.filters import KINDS, PROFILES, FilterSpec, apply_gain, shape_gain
+
+EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp", ".tif", ".tiff", ".webp")
+STAGES = ("read", "decode", "fft", "filter", "inverse", "encode", "write")
+# budget of the per-shape gains kept by each worker
+GAIN_CACHE_BYTES = 256 * 2**20
+
+# set in every worker by _init_worker
+_settings = None
+_gains = OrderedDict()
+
+
+@dataclass
+class BatchConfig:
+    spec: Optional[FilterSpec] = None
+    # uint8 or boolean mask on the centred full plane; nonzero frequencies are
+    # removed. Scaled to every image shape with nearest neighbour
+    mask: Optional[np.ndarray] = None
+    # 0 filters in the calling process
+    processes: Optional[int] = None
+    # images read but not yet written; bounds memory
+    read_ahead: int = 8
+    # FFT threads per process (needs scipy)
+    fft_workers: Optional[int] = None
+    overwrite: bool = True
+
+
+@dataclass
+class BatchReport:
+    images: int = 0
+    bytes_in: int = 0
+    bytes_out: int = 0
+    seconds: float = 0.0
+    # summed over all images (and processes), so stages can add up to more
+    # than the wall time
+    stage_seconds: dict = field(default_factory=lambda: dict.fromkeys(STAGES, 0.0))
+    # (name, error message)
+    failed: list = field(default_factory=list)
+
+    @property
+    def images_per_second(self):
+        return self.images / self.seconds if self.seconds else 0.0
+
+    @property
+    def mb_per_second(self):
+        return self.bytes_in / 2**20 / self.seconds if self.seconds else 0.0
+
+    def summary(self):
+        lines = [f"{self.images} images, {len(self.failed)} failed in {self.seconds:.2f}s: "
+                 f"{self.images_per_second:.2f} images/s, {self.mb_per_second:.2f} MB/s read"]
+        lines += [f"  {stage:<8}{seconds:9.3f}s" for stage, seconds in self.stage_seconds.items()]
+        lines += [f"  failed {name}: {error}" for name, error in self.failed]
+        return "\n".join(lines)
+
+
+def iter_sources(path, extensions=EXTENSIONS):
+    """
+    Streaming the image files of a directory (recursively, sorted), a zip or
+    a tar archive, one at a time
+    Output:
+    Generator of (relative name, file bytes)
+    """
+    def wanted(name):
+        return name.lower().endswith(extensions)
+
+    if os.path.isdir(path):
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            for name in sorted(files):
+                if wanted(name):
+                    full = os.path.join(root, name)
+                    with open(full, "rb") as file:
+                        yield os.path.relpath(full, path), file.read()
+    elif zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as archive:
+            for info in archive.infolist():
+                if not info.is_dir() and wanted(info.filename):
+                    yield info.filename, archive.read(info)
+    elif tarfile.is_tarfile(path):
+        # stream mode reads the archive front to back without an index
+        with tarfile.open(path, "r|*") as archive:
+            for member in archive:
+                if member.isfile() and wanted(member.name):
+                    yield member.name, archive.extractfile(member).read()
+    else:
+        raise ValueError(f"{path} is not a directory, zip or tar archive")
+
+
+def _init_worker(config, output_dir):
+    global _settings
+    _settings = (config, output_dir)
+    _gains.clear()
+
+
+def _gain_for(shape):
+    # the per-shape plan: filter gain with the masked frequencies removed,
+    # kept LRU within GAIN_CACHE_BYTES (the latest one always stays)
+    if shape in _gains:
+        _gains.move_to_end(shape)
+        return _gains[shape]
+    config = _settings[0]
+    gain = _gains[shape] = shape_gain(config.spec, config.mask, shape)
+    while len(_gains) > 1 and sum(cached.nbytes for cached in _gains.values()) > GAIN_CACHE_BYTES:
+        _gains.popitem(last=False)
+    return gain
+
+
+def _output_path(output_dir, name):
+    # archive names may use "/" or contain ".." parts; keep them inside output_dir.
+    # The source suffix stays in the name, so a.jpg and a.png do not both
+    # write a.png
+    parts = [part for part in name.replace("\\", "/").split("/") if part not in ("", ".", "..")]
+    return os.path.join(output_dir, *parts[:-1], parts[-1] + ".png")
+
+
+def filter_one(name, data):
+    """
+    Filtering one encoded image in a worker and writing it as PNG
+    Output:
+    (name, bytes written, seconds per stage)
+    """
+    config, output_dir = _settings
+    timings = {}
+    start = time.perf_counter()
+
+    def lap(stage):
+        nonlocal start
+        now = time.perf_counter()
+        timings[stage] = now - start
+        start = now
+
+    image = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+    if image is None:
+        raise ValueError("not a decodable image")
+    lap("decode")
+    half = rfft_image(image, config.fft_workers)
+    lap("fft")
+    apply_gain(half, _gain_for(image.shape[:2]))
+    lap("filter")
+    result = to_uint8(irfft_image(half, image.shape[1], config.fft_workers))
+    lap("inverse")
+    ok, encoded = cv2.imencode(".png", result)
+    if not ok:
+        raise ValueError("could not encode the result")
+    lap("encode")
+
+    path = _output_path(output_dir, name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    descriptor, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    with os.fdopen(descriptor, "wb") as file:
+        file.write(encoded.tobytes())
+    os.replace(temp_path, path)
+    lap("write")
+    return name, encoded.nbytes, timings
+
+
+def _record(report, name, size, future):
+    try:
+        _, written, timings = future.result()
+    except Exception as error:
+        report.failed.append((name, str(error)))
+        return
+    report.images += 1
+    report.bytes_in += size
+    report.bytes_out += written
+    for stage, seconds in timings.items():
+        report.stage_seconds[stage] += seconds
+
+
+class _Inline:
+    # executor-like wrapper running each call immediately, for processes=0
+    def submit(self, fn, *args):
+        future = Future()
+        try:
+            future.set_result(fn(*args))
+        except Exception as error:
+            future.set_exception(error)
+        return future
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+def run_batch(source, output_dir, config=None, on_result=None):
+    """
+    Filtering every image of a directory or archive into output_dir
+    Input:
+    1- Directory, zip or tar archive of images
+    2- Output directory; results keep their relative paths with ".png"
+       appended (a.jpg -> a.jpg.png)
+    3- BatchConfig (optional)
+    4- Callback receiving the BatchReport after every finished image (optional)
+    Output:
+    BatchReport
+    """
+    config = config or BatchConfig()
+    if not config.overwrite and os.path.isdir(output_dir) and os.listdir(output_dir):
+        raise FileExistsError(f"{output_dir} is not empty")
+    os.makedirs(output_dir, exist_ok=True)
+    report = BatchReport()
+    started = time.perf_counter()
+
+    if config.processes == 0:
+        _init_worker(config, output_dir)
+        executor = _Inline()
+    else:
+        executor = ProcessPoolExecutor(config.processes, initializer=_init_worker, initargs=(config, output_dir))
+
+    pending = {}
+    with executor:
+        sources = iter_sources(source)
+        while True:
+            read_start = time.perf_counter()
+            item = next(sources, None)
+            report.stage_seconds["read"] += time.perf_counter() - read_start
+            if item is not None:
+                name, data = item
+                pending[executor.submit(filter_one, name, data)] = (name, len(data))
+            if pending and (item is None or len(pending) >= max(config.read_ahead, 1)):
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    _record(report, *pending.pop(future), future)
+                    report.seconds = time.perf_counter() - started
+                    if on_result is not None:
+                        on_result(report)
+            if item is None and not pending:
+                break
+
+    report.seconds = time.perf_counter() - started
+    return report
+
+
+def _center(text):
+    vertical, horizontal = (float(value) for value in text.split(","))
+    return vertical, horizontal
+
+
+def add_filter_arguments(parser):
+    """
+    --kind, --profile, --cutoff, --high, --order, --center and --mask options
+    shared by the batch and video entry points
+    """
+    parser.add_argument("--kind", choices=KINDS, help="analytic filter; none keeps only the mask")
+    parser.add_argument("--profile", choices=PROFILES, default="ideal")
+    parser.add_argument("--cutoff", type=float, default=0.1, help="cycles per pixel")
+    parser.add_argument("--high", type=float, default=0.25, help="upper cut-off of band filters")
+    parser.add_argument("--order", type=int, default=2, help="butterworth order")
+    parser.add_argument("--center", type=_center, action="append", default=[],
+                        help="notch centre as vertical,horizontal cycles per pixel")
+    parser.add_argument("--mask", help="image whose non-black pixels mark frequencies to remove, zero in the centre")
+
+
+def filter_from_arguments(parser, args):
+    """
+    (FilterSpec or None, mask or None) from parsed add_filter_arguments options
+    """
+    spec = None
+    if args.kind:
+        try:
+            spec = FilterSpec(args.kind, args.profile, args.cutoff, args.high, args.order, tuple(args.center))
+        except ValueError as error:
+            parser.error(str(error))
+    mask = None
+    if args.mask:
+        mask = cv2.imread(args.mask, cv2.IMREAD_GRAYSCALE)
+        if mask is None:
+            parser.error(f"cannot read mask {args.mask}")
+    if spec is None and mask is None:
+        parser.error("give a --kind, a --mask or both")
+    return spec, mask
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("source", help="directory, zip or tar archive of images")
+    parser.add_argument("output", help="directory for the filtered PNGs")
+    add_filter_arguments(parser)
+    parser.add_argument("--processes", type=int, help="worker processes, 0 runs inline (default: CPU count)")
+    parser.add_argument("--read-ahead", type=int, default=8, help="images in flight at once")
+    parser.add_argument("--fft-workers", type=int, help="FFT threads per process")
+    args = parser.parse_args(argv)
+    spec, mask = filter_from_arguments(parser, args)
+
+    config = BatchConfig(spec, mask, args.processes, args.read_ahead, args.fft_workers)
+    report = run_batch(args.source, args.output, config,
+                       on_result=lambda progress: print(f"\r{progress.images} images, "
+                                                        f"{progress.images_per_second:.2f}/s", end="", flush=True))
+    print()
+    print(report.summary())
+    return 1 if report.failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
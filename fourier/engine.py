@@ -0,0 +1,166 @@
+"""
+Batched spectrum engine: every colour channel is transformed in one call
+over the spatial axes. The default path works on float32 real input with
+rfft2 / irfft2, so only the non-negative horizontal frequencies are stored.
+scipy.fft is used when installed, for its workers (threads) argument;
+numpy.fft is the fallback.
+
+Both transforms can write into a preallocated out buffer, for callers that
+transform many images of one shape (fourier.video). scipy.fft has no out
+argument, so that path goes through the pocketfft binding scipy.fft itself
+calls; numpy >= 2 takes out directly, and older versions copy the result.
+"""
+import numpy as np
+
+try:
+    import scipy.fft as _fft
+    HAS_WORKERS = True
+except ImportError:
+    _fft = np.fft
+    HAS_WORKERS = False
+
+try:
+    from scipy.fft._pocketfft import pypocketfft as _pocketfft
+except ImportError:
+    _pocketfft = None
+
+NUMPY_OUT = np.lib.NumpyVersion(np.__version__) >= "2.0.0"
+SPATIAL_AXES = (0, 1)
+
+
+def _workers(workers):
+    return {"workers": workers} if HAS_WORKERS and workers is not None else {}
+
+
+def _threads(workers):
+    # pocketfft's thread count; like scipy.fft, None is one thread
+    return max(workers or 1, 1)
+
+
+def rfft_image(image, workers=None, out=None):
+    """
+    Real FFT of all channels at once
+    Input:
+    1- Image of shape (height, width, channels); only the first three
+       channels are used
+    2- Number of FFT threads (optional, needs scipy)
+    3- complex64 array of the output shape to write into (optional)
+    Output:
+    complex64 half spectrum of shape (height, width // 2 + 1, channels),
+    zero frequency at [0, 0]
+    """
+    # float32 three-channel input (e.g. a reused frame buffer) is not copied
+    channels = np.asarray(image)[:, :, :3].astype(np.float32, copy=False)
+    if out is None:
+        return _fft.rfft2(channels, axes=SPATIAL_AXES, **_workers(workers))
+    if _pocketfft is not None:
+        return _pocketfft.r2c(channels, axes=SPATIAL_AXES, forward=True, out=out, nthreads=_threads(workers))
+    if NUMPY_OUT:
+        return np.fft.rfft2(channels, axes=SPATIAL_AXES, out=out)
+    out[...] = _fft.rfft2(channels, axes=SPATIAL_AXES, **_workers(workers))
+    return out
+
+
+def irfft_image(half, width, workers=None, out=None):
+    """
+    Inverse of rfft_image; the half spectrum is not modified
+    Input:
+    1- Half spectrum of shape (height, width // 2 + 1, channels)
+    2- Image width
+    3- Number of FFT threads (optional, needs scipy)
+    4- float32 array of the output shape to write into (optional)
+    Output:
+    float32 image of shape (height, width, channels)
+    """
+    shape = (half.shape[0], width)
+    if out is None:
+        return _fft.irfft2(half, s=shape, axes=SPATIAL_AXES, **_workers(workers))
+    if _pocketfft is not None:
+        # inorm=2 divides by height * width, as irfft2 does
+        return _pocketfft.c2r(half, axes=SPATIAL_AXES, lastsize=width, forward=False, inorm=2, out=out,
+                              nthreads=_threads(workers))
+    if NUMPY_OUT:
+        return np.fft.irfft2(half, s=shape, axes=SPATIAL_AXES, out=out)
+    out[...] = _fft.irfft2(half, s=shape, axes=SPATIAL_AXES, **_workers(workers))
+    return out
+
+
+def _mirror_indices(height, width):
+    # index of the frequency (-u, -v) for every (u, v) of the full plane
+    rows = (-np.arange(height)) % height
+    cols = (-np.arange(width)) % width
+    return rows, cols
+
+
+def full_plane(half, width):
+    """
+    Full, centred spectrum rebuilt from a half spectrum using the conjugate
+    symmetry of real input
+    Output:
+    Complex array of shape (height, width, channels)
+    """
+    height, half_width = half.shape[:2]
+    full = np.empty((height, width) + half.shape[2:], dtype=half.dtype)
+    full[:, :half_width] = half
+    rows, cols = _mirror_indices(height, width)
+    full[:, half_width:] = np.conj(half[rows][:, cols[half_width:]])
+    return np.fft.fftshift(full, axes=SPATIAL_AXES)
+
+
+def log_magnitude(half, width):
+    """
+    float32 log magnitude of the full, centred spectrum of a half spectrum
+    """
+    magnitude = np.abs(full_plane(half, width))
+    with np.errstate(divide="ignore"):
+        return np.log(magnitude, out=magnitude)
+
+
+def half_mask(mask):
+    """
+    Mask drawn on the centred full plane, as a mask of the half spectrum.
+    Masking a frequency also masks its mirror (-u, -v), which keeps the
+    result of the inverse transform real
+    Input:
+    1- Boolean mask of shape (height, width), zero frequency in the centre
+    Output:
+    Boolean mask of shape (height, width // 2 + 1)
+    """
+    height, width = mask.shape
+    unshifted = np.fft.ifftshift(mask)
+    rows, cols = _mirror_indices(height, width)
+    symmetric = unshifted | unshifted[rows][:, cols]
+    return symmetric[:, :width // 2 + 1]
+
+
+def to_uint8(image, out=None):
+    """
+    Magnitude rounded and clipped to 0-255 as uint8, working in place on
+    float input; rounding keeps float32 noise (254.99998) from truncating.
+    Written into out when given
+    """
+    if not np.issubdtype(image.dtype, np.floating):
+        image = image.astype(np.float32)
+    np.abs(image, out=image)
+    np.minimum(image, 255, out=image)
+    np.rint(image, out=image)
+    if out is None:
+        return image.astype(np.uint8)
+    np.copyto(out, image, casting="unsafe")
+    return out
+
+
+def masked_inverse(half, masks, width, workers=None):
+    """
+    Inverse transform of a half spectrum with the masked coefficients of
+    every channel removed (set to 0), as fourier.filters.combine_gain does
+    Input:
+    1- Half spectrum of shape (height, width // 2 + 1, channels)
+    2- Boolean masks on the centred full plane, one (height, width) mask per
+       channel
+    3- Image width
+    Output:
+    uint8 image of shape (height, width, channels)
+    """
+    mask = np.stack([half_mask(channel_mask) for channel_mask in masks], axis=-1)
+    return to_uint8(irfft_image(np.where(mask, np.complex64(0), half), width, workers))
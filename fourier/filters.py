@@ -0,0 +1,183 @@
+"""
+Parametric frequency-domain filters. A filter is a float32 gain of the
+half spectrum (see fourier.engine), shape (height, width // 2 + 1), built
+from broadcast frequency coordinates. Gains are not cached here, since a
+full resolution gain is tens of MiB; fourier.batch and fourier.video keep
+the gains they reuse for one image shape.
+
+Frequencies are in cycles per pixel (0 to 0.5 along each axis), so a
+FilterSpec means the same thing at any image size.
+"""
+from dataclasses import dataclass
+from functools import lru_cache
+
+import numpy as np
+
+from fourier.engine import half_mask, irfft_image, to_uint8
+from fourier.pyramid import upscale_mask
+
+KINDS = ("lowpass", "highpass", "bandpass", "bandstop", "notch")
+PROFILES = ("ideal", "gaussian", "butterworth")
+
+
+@dataclass(frozen=True)
+class FilterSpec:
+    kind: str = "lowpass"
+    profile: str = "ideal"
+    # cut-off radius in cycles per pixel; for notch, the radius of each notch
+    cutoff: float = 0.1
+    # upper cut-off of bandpass / bandstop
+    high: float = 0.25
+    # butterworth order
+    order: int = 2
+    # notch centres as (vertical, horizontal) frequencies; their mirrors
+    # (-v, -h) are rejected too
+    centers: tuple = ()
+
+    def __post_init__(self):
+        if self.kind not in KINDS:
+            raise ValueError(f"Unknown filter kind {self.kind!r}, expected one of {KINDS}")
+        if self.profile not in PROFILES:
+            raise ValueError(f"Unknown filter profile {self.profile!r}, expected one of {PROFILES}")
+        if self.cutoff <= 0:
+            raise ValueError("cutoff must be positive")
+        if self.kind in ("bandpass", "bandstop") and self.high <= self.cutoff:
+            raise ValueError("high must be above cutoff for band filters")
+        if self.kind == "notch" and not self.centers:
+            raise ValueError("A notch filter needs at least one centre")
+        if any(len(center) != 2 for center in self.centers):
+            raise ValueError("Notch centres are (vertical, horizontal) pairs")
+
+
+@lru_cache(maxsize=32)
+def frequency_grid(shape):
+    """
+    Broadcastable frequency coordinates of the half spectrum of an image of
+    shape (height, width)
+    Output:
+    float32 column of vertical frequencies (height, 1) and row of horizontal
+    frequencies (1, width // 2 + 1), in cycles per pixel
+    """
+    height, width = shape
+    rows = np.fft.fftfreq(height).astype(np.float32)[:, None]
+    cols = np.fft.rfftfreq(width).astype(np.float32)[None, :]
+    rows.setflags(write=False)
+    cols.setflags(write=False)
+    return rows, cols
+
+
+def _lowpass(distance, cutoff, profile, order):
+    # gain in place on the float32 distance array
+    if profile == "ideal":
+        return (distance <= cutoff).astype(np.float32)
+    if profile == "gaussian":
+        distance /= cutoff
+        np.square(distance, out=distance)
+        distance *= -0.5
+        return np.exp(distance, out=distance)
+    distance /= cutoff
+    np.power(distance, 2 * order, out=distance)
+    distance += 1
+    return np.reciprocal(distance, out=distance)
+
+
+def _highpass(distance, cutoff, profile, order):
+    gain = _lowpass(distance, cutoff, profile, order)
+    np.subtract(1, gain, out=gain)
+    return gain
+
+
+def _build(spec, shape):
+    rows, cols = frequency_grid(shape)
+    if spec.kind == "notch":
+        gain = np.ones((len(rows), cols.shape[1]), dtype=np.float32)
+        for v, h in spec.centers:
+            for sign in (1, -1):
+                gain *= _highpass(np.hypot(rows - sign * v, cols - sign * h), spec.cutoff, spec.profile, spec.order)
+        return gain
+
+    radius = np.hypot(rows, cols)
+    if spec.kind == "lowpass":
+        return _lowpass(radius, spec.cutoff, spec.profile, spec.order)
+    if spec.kind == "highpass":
+        return _highpass(radius, spec.cutoff, spec.profile, spec.order)
+    # a band is the product of a low-pass at high and a high-pass at cutoff
+    band = _lowpass(radius.copy(), spec.high, spec.profile, spec.order)
+    band *= _highpass(radius, spec.cutoff, spec.profile, spec.order)
+    if spec.kind == "bandstop":
+        np.subtract(1, band, out=band)
+    return band
+
+
+def filter_gain(spec, shape):
+    """
+    Gain of a filter on the half spectrum
+    Input:
+    1- FilterSpec
+    2- Image (height, width)
+    Output:
+    float32 array of shape (height, width // 2 + 1), 1 passes a
+    frequency and 0 removes it
+    """
+    return _build(spec, tuple(shape))
+
+
+def shape_gain(spec, mask, shape):
+    """
+    Gain of an optional filter and an optional mask for one image shape
+    Input:
+    1- FilterSpec, or None to pass everything
+    2- uint8 or boolean mask on the centred full plane, nonzero frequencies
+       removed; scaled to shape with nearest neighbour (optional)
+    3- Image (height, width)
+    Output:
+    float32 gain of shape (height, width // 2 + 1)
+    """
+    height, width = shape
+    if spec is None:
+        gain = np.ones((height, width // 2 + 1), dtype=np.float32)
+    else:
+        gain = filter_gain(spec, (height, width))
+    if mask is not None:
+        painted = half_mask(upscale_mask(np.asarray(mask) > 0, (height, width)))
+        gain = np.where(painted, np.float32(0), gain)
+    return gain
+
+
+def combine_gain(gain, masks):
+    """
+    Filter gain with the frequencies painted on canvas masks removed too
+    Input:
+    1- Gain of shape (height, width // 2 + 1)
+    2- Boolean masks on the centred full plane, one (height, width) mask per
+       channel
+    Output:
+    float32 gain of shape (height, width // 2 + 1, channels)
+    """
+    painted = np.stack([half_mask(mask) for mask in masks], axis=-1)
+    return np.where(painted, np.float32(0), gain[..., None])
+
+
+def apply_gain(half, gain):
+    """
+    Multiplying a half spectrum by a gain, in place
+    Input:
+    1- Half spectrum of shape (height, width // 2 + 1, channels)
+    2- Gain of shape (height, width // 2 + 1), or one per channel with a
+       trailing channel axis
+    Output:
+    The same half spectrum
+    """
+    if gain.ndim == 2:
+        gain = gain[..., None]
+    return np.multiply(half, gain, out=half)
+
+
+def filtered_inverse(half, gain, width, workers=None, in_place=False):
+    """
+    Inverse transform of a filtered half spectrum, as a uint8 image; the
+    half spectrum is only overwritten with in_place=True
+    """
+    if not in_place:
+        half = half.copy()
+    return to_uint8(irfft_image(apply_gain(half, gain), width, workers))
@@ -0,0 +1,25 @@
+"""
+Masks drawn on the spectrum canvases, kept as in-memory arrays.
+"""
+import numpy as np
+
+
+def mask_from_canvas(image_data, shape=None):
+    """
+    Alpha channel of a canvas' RGBA image data as a uint8 mask; strokes are
+    opaque, untouched pixels transparent
+    Input:
+    1- RGBA array from st_canvas (or None before the canvas has rendered)
+    2- (height, width) to use when there is no image data yet (optional)
+    """
+    if image_data is None:
+        return np.zeros(shape, dtype=np.uint8)
+    return np.ascontiguousarray(image_data[:, :, 3], dtype=np.uint8)
+
+
+def mask_bool(mask, threshold=120):
+    """
+    Pixels of a uint8 mask above threshold
+    """
+    return mask > threshold
+
@@ -0,0 +1,64 @@
+"""
+Preview resolution for the Fourier editor. Canvases show downsampled
+spectra; masks drawn on them are scaled back up and applied to the full
+resolution spectrum. Images sent to the browser are resized to display
+size.
+"""
+import cv2
+import numpy as np
+
+# longest side of the canvases and of displayed images, in pixels
+PREVIEW_SIDE = 800
+
+
+def preview_shape(shape, max_side=PREVIEW_SIDE):
+    """
+    (height, width) of shape scaled down so that its longest side is at most
+    max_side; images that already fit keep their size
+    """
+    height, width = shape[:2]
+    scale = min(1.0, max_side / max(height, width))
+    return max(1, round(height * scale)), max(1, round(width * scale))
+
+
+def resize_to(image, shape):
+    """
+    Area-averaged downsampling (or nearest-neighbour upsampling) of an image
+    to (height, width)
+    """
+    height, width = shape
+    if image.shape[:2] == (height, width):
+        return image
+    shrinking = height <= image.shape[0] and width <= image.shape[1]
+    return cv2.resize(image, (width, height), interpolation=cv2.INTER_AREA if shrinking else cv2.INTER_NEAREST)
+
+
+def fit_for_display(image, max_side=PREVIEW_SIDE):
+    return resize_to(image, preview_shape(image.shape, max_side))
+
+
+def upscale_mask(mask, shape):
+    """
+    Mask drawn on a preview, scaled with nearest neighbour to the full
+    (height, width) so every full resolution frequency under a stroke is
+    covered
+    """
+    height, width = shape
+    if mask.shape == (height, width):
+        return mask
+    # cv2 has no boolean images
+    resized = cv2.resize(np.ascontiguousarray(mask, dtype=np.uint8), (width, height), interpolation=cv2.INTER_NEAREST)
+    return resized.astype(bool) if mask.dtype == bool else resized
+
+
+def png_bytes(image):
+    """
+    RGB (or grayscale) uint8 image encoded as PNG, for full resolution
+    downloads
+    """
+    if image.ndim == 3:
+        image = cv2.cvtColor(image, cv2.COLOR_RGB2BGR)
+    ok, encoded = cv2.imencode(".png", image)
+    if not ok:
+        raise ValueError("Could not encode the image as PNG")
+    return encoded.tobytes()
@@ -0,0 +1,136 @@
+"""
+Spectra of uploaded images, cached by content hash. An entry keeps the
+decoded image, its float32 half spectrum (see fourier.engine) and the
+preview-sized log-magnitude images drawn under the canvases, so redraws only
+mask and inverse-transform.
+"""
+import hashlib
+import io
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import numpy as np
+from PIL import Image
+
+from fourier.engine import log_magnitude, rfft_image
+from fourier.pyramid import PREVIEW_SIDE, fit_for_display, preview_shape, resize_to
+
+_default = None
+_default_lock = threading.Lock()
+
+
+@dataclass
+class Spectrum:
+    image: np.ndarray
+    # complex64 half spectrum, shape (height, width // 2 + 1, channels)
+    half: np.ndarray
+    # uint8 RGB previews of the log magnitudes, one per channel, at preview size
+    previews: list
+    # the image itself at preview size
+    thumbnail: np.ndarray
+
+    @property
+    def width(self):
+        return self.image.shape[1]
+
+    @property
+    def preview_shape(self):
+        return self.thumbnail.shape[:2]
+
+    @property
+    def nbytes(self):
+        arrays = [self.image, self.half, self.thumbnail] + self.previews
+        return sum(array.nbytes for array in arrays)
+
+
+def content_key(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def log_preview(log_magnitude, shape=None):
+    """
+    Log magnitude scaled to 0-255 by its maximum, as an RGB uint8 image,
+    area-downsampled to (height, width) if shape is given
+    """
+    peak = np.max(log_magnitude)
+    # magnitudes below 1 (and zeros, whose log is -inf) show as black anyway
+    log_magnitude = np.maximum(log_magnitude, 0)
+    if shape is not None:
+        log_magnitude = resize_to(log_magnitude, shape)
+    scaled = np.clip(log_magnitude / peak * 255, 0, 255).astype('uint8')
+    return np.dstack([scaled, scaled, scaled])
+
+
+def compute_spectrum(image, workers=None, max_side=PREVIEW_SIDE):
+    half = rfft_image(image, workers)
+    shape = preview_shape(image.shape, max_side)
+    # one channel at a time, so only one full resolution log magnitude exists
+    previews = [log_preview(log_magnitude(half[:, :, i:i + 1], image.shape[1])[:, :, 0], shape)
+                for i in range(half.shape[2])]
+    return Spectrum(image, half, previews, fit_for_display(image, max_side))
+
+
+def decode_image(data):
+    return np.array(Image.open(io.BytesIO(data)))
+
+
+class SpectrumCache:
+    """
+    LRU cache of Spectrum entries keyed by the image file's content hash,
+    bounded by the total size of the arrays it holds
+    Input:
+    1- Byte budget; the most recent entry is kept even if it alone is larger
+    2- Number of FFT threads (optional, needs scipy)
+    """
+
+    def __init__(self, max_bytes=1 * 2**30, workers=None):
+        self.max_bytes = max_bytes
+        self.workers = workers
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._nbytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, data):
+        """
+        Spectrum of an encoded image file (e.g. an upload's bytes), computed
+        only on the first request
+        """
+        key = content_key(data)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+
+        entry = compute_spectrum(decode_image(data), self.workers)
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = entry
+                self._nbytes += entry.nbytes
+                self._evict()
+        return entry
+
+    def _evict(self):
+        while self._nbytes > self.max_bytes and len(self._entries) > 1:
+            _, entry = self._entries.popitem(last=False)
+            self._nbytes -= entry.nbytes
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries), "bytes": self._nbytes}
+
+
+def default_spectrum_cache():
+    """
+    Process-wide spectrum cache shared by every session
+    """
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = SpectrumCache(workers=os.cpu_count())
+        return _default
@@ -0,0 +1,259 @@
+"""
+Streaming Fourier filtering of video. Frames are decoded with
+cv2.VideoCapture, filtered with a fixed gain and encoded with
+cv2.VideoWriter, each stage on its own thread with bounded queues between
+them:
+
+    python -m fourier.video input.mp4 output.mp4 --kind notch --center 0,0.25
+
+The frame shape is fixed for a stream, so the gain is built once and the
+frame, float32, half spectrum and output buffers are preallocated and
+recycled; the FFTs write straight into them. The FFTs
+release the GIL, so decoding and encoding overlap with the transforms, and
+each transform is split across every CPU unless --fft-workers says otherwise.
+"""
+import argparse
+import os
+import queue
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+
+import cv2
+import numpy as np
+
+from fourier.batch import add_filter_arguments, filter_from_arguments
+from fourier.engine import irfft_image, rfft_image, to_uint8
+from fourier.filters import apply_gain, shape_gain
+
+STAGES = ("decode", "transform", "encode")
+
+# end of stream marker on the queues
+_DONE = object()
+
+
+@dataclass
+class VideoReport:
+    frames: int = 0
+    seconds: float = 0.0
+    # frame rate of the source, 0 if the container does not say
+    source_fps: float = 0.0
+    # busy time of each stage's thread
+    stage_seconds: dict = field(default_factory=lambda: dict.fromkeys(STAGES, 0.0))
+
+    @property
+    def fps(self):
+        return self.frames / self.seconds if self.seconds else 0.0
+
+    @property
+    def realtime(self):
+        return self.source_fps > 0 and self.fps >= self.source_fps
+
+    def summary(self):
+        lines = [f"{self.frames} frames in {self.seconds:.2f}s: {self.fps:.1f} fps "
+                 f"(source {self.source_fps:.1f} fps, {'' if self.realtime else 'not '}real time)"]
+        lines += [f"  {stage:<10}{seconds:9.3f}s" for stage, seconds in self.stage_seconds.items()]
+        return "\n".join(lines)
+
+
+class FramePlan:
+    """
+    Transform state for one frame shape: the gain and the float32 input,
+    complex64 half spectrum and float32 output buffers every frame reuses
+    Input:
+    1- Frame shape (height, width, 3)
+    2- FilterSpec (optional)
+    3- Mask on the centred full plane (optional)
+    4- Number of FFT threads (optional, needs scipy)
+    """
+
+    def __init__(self, shape, spec=None, mask=None, workers=None):
+        self.shape = tuple(shape)
+        self.workers = workers
+        self.gain = shape_gain(spec, mask, self.shape[:2])
+        self._input = np.empty(self.shape, dtype=np.float32)
+        self._half = np.empty((self.shape[0], self.shape[1] // 2 + 1, self.shape[2]), dtype=np.complex64)
+        self._output = np.empty(self.shape, dtype=np.float32)
+
+    def apply(self, frame, out):
+        """
+        Filtered frame written into out (uint8, same shape as frame)
+        """
+        np.copyto(self._input, frame, casting="unsafe")
+        rfft_image(self._input, self.workers, out=self._half)
+        apply_gain(self._half, self.gain)
+        irfft_image(self._half, self.shape[1], self.workers, out=self._output)
+        return to_uint8(self._output, out=out)
+
+
+def _buffers(shape, count):
+    pool = queue.Queue()
+    for _ in range(count):
+        pool.put(np.empty(shape, dtype=np.uint8))
+    return pool
+
+
+def filter_video(source, output, spec=None, mask=None, queue_size=4, fft_workers=None, fourcc="mp4v",
+                 max_frames=None, on_progress=None):
+    """
+    Filtering every frame of a video with one gain
+    Input:
+    1- Path (or device index) of the input video
+    2- Path of the output video
+    3- FilterSpec (optional)
+    4- Mask on the centred full plane, nonzero frequencies removed (optional)
+    5- Frames queued between stages; bounds memory (optional)
+    6- FFT threads for the transform stage, all CPUs by default (optional,
+       needs scipy)
+    7- FourCC of the output codec (optional)
+    8- Stop after this many frames (optional)
+    9- Callback receiving the VideoReport after every written frame (optional)
+    Output:
+    VideoReport
+    """
+    capture = cv2.VideoCapture(source)
+    if not capture.isOpened():
+        raise ValueError(f"Cannot open video {source!r}")
+    width = int(capture.get(cv2.CAP_PROP_FRAME_WIDTH))
+    height = int(capture.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    source_fps = capture.get(cv2.CAP_PROP_FPS) or 0.0
+    shape = (height, width, 3)
+    writer = cv2.VideoWriter(output, cv2.VideoWriter_fourcc(*fourcc), source_fps or 30.0, (width, height))
+    if not writer.isOpened():
+        capture.release()
+        raise ValueError(f"Cannot write video {output!r} with codec {fourcc!r}")
+
+    # the transform is the slowest stage, so it gets every core
+    plan = FramePlan(shape, spec, mask, fft_workers or os.cpu_count())
+    report = VideoReport(source_fps=source_fps)
+    # every buffer is either free, queued or in use by one stage
+    free_frames = _buffers(shape, queue_size + 2)
+    free_outputs = _buffers(shape, queue_size + 2)
+    decoded = queue.Queue(queue_size)
+    filtered = queue.Queue(queue_size)
+    stop = threading.Event()
+    errors = []
+
+    def put(target, item):
+        # gives up when another stage failed, instead of blocking forever
+        while not stop.is_set():
+            try:
+                target.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def get(source_queue):
+        while not stop.is_set():
+            try:
+                return source_queue.get(timeout=0.1)
+            except queue.Empty:
+                pass
+        return _DONE
+
+    def stage(name, body):
+        def run():
+            try:
+                body()
+            except BaseException as error:
+                errors.append(error)
+                stop.set()
+        return threading.Thread(target=run, name=f"fourier-{name}", daemon=True)
+
+    def decode():
+        count = 0
+        while max_frames is None or count < max_frames:
+            buffer = get(free_frames)
+            if buffer is _DONE:
+                return
+            start = time.perf_counter()
+            ok, frame = capture.read(buffer)
+            report.stage_seconds["decode"] += time.perf_counter() - start
+            if not ok:
+                break
+            if frame is not buffer:
+                # some backends allocate a new array instead of reusing ours
+                np.copyto(buffer, frame)
+            if not put(decoded, buffer):
+                return
+            count += 1
+        put(decoded, _DONE)
+
+    def transform():
+        while True:
+            frame = get(decoded)
+            if frame is _DONE:
+                put(filtered, _DONE)
+                return
+            out = get(free_outputs)
+            if out is _DONE:
+                return
+            start = time.perf_counter()
+            plan.apply(frame, out)
+            report.stage_seconds["transform"] += time.perf_counter() - start
+            free_frames.put(frame)
+            if not put(filtered, out):
+                return
+
+    def encode():
+        while True:
+            frame = get(filtered)
+            if frame is _DONE:
+                return
+            start = time.perf_counter()
+            writer.write(frame)
+            report.stage_seconds["encode"] += time.perf_counter() - start
+            free_outputs.put(frame)
+            report.frames += 1
+            report.seconds = time.perf_counter() - started
+            if on_progress is not None:
+                on_progress(report)
+
+    threads = [stage("decode", decode), stage("transform", transform), stage("encode", encode)]
+    started = time.perf_counter()
+    try:
+        for thread in threads:
+            thread.start()
+        # the encoder finishes last; the other stages end on their own or on stop
+        for thread in reversed(threads):
+            while thread.is_alive():
+                thread.join(0.1)
+    except KeyboardInterrupt:
+        stop.set()
+        for thread in threads:
+            thread.join()
+        raise
+    finally:
+        capture.release()
+        writer.release()
+
+    report.seconds = time.perf_counter() - started
+    if errors:
+        raise errors[0]
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("source", help="input video file")
+    parser.add_argument("output", help="output video file")
+    add_filter_arguments(parser)
+    parser.add_argument("--queue-size", type=int, default=4, help="frames queued between stages")
+    parser.add_argument("--fft-workers", type=int, help="FFT threads for the transform stage")
+    parser.add_argument("--fourcc", default="mp4v", help="output codec")
+    parser.add_argument("--max-frames", type=int, help="stop after this many frames")
+    args = parser.parse_args(argv)
+    spec, mask = filter_from_arguments(parser, args)
+
+    report = filter_video(args.source, args.output, spec, mask, args.queue_size, args.fft_workers, args.fourcc,
+                          args.max_frames, on_progress=lambda progress: print(
+                              f"\r{progress.frames} frames, {progress.fps:.1f} fps", end="", flush=True))
+    print()
+    print(report.summary())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
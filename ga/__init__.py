@@ -0,0 +1,76 @@
+"""
+Headless genetic algorithm solvers and building blocks. The Streamlit pages
+are thin UIs on top of this package; batch jobs and services can import the
+solvers directly.
+"""
+
+from ga.cache import ResultCache, default_cache, stable_key
+from ga.crossover import crossover_offspring, one_point_crossover, order_crossover
+from ga.islands import migrate, run_islands
+from ga.jobs import JobCancelled, JobRunner, default_runner, run_solver_job, run_string_job
+from ga.local_search import improve_tour, nearest_neighbours, or_opt, refine_elite, two_opt
+from ga.ratings import Ratings, load_ratings
+from ga.multichannel import (MultiScheduleConfig, MultiScheduleResult, ScheduleConstraints, broadcast_ratings,
+                             greedy_schedule, optimize_schedule)
+from ga.population import index_dtype, random_tours
+from ga.progress import FitnessHistory, throttled
+from ga.selection import select_parents
+from ga.strings import (StringGAConfig, StringGAResult, StringGAStats, evolve_string, evolve_strings, island_string,
+                        solve_string)
+from ga.tour import distance_matrix, tour_lengths
+from ga.tsp import TSPConfig, TSPResult, evolve_tours, island_tsp, solve_tsp, swap_mutation
+from ga.tv import TVConfig, TVResult, evolve_schedules, island_schedule, schedule_programs
+
+__all__ = [
+    "FitnessHistory",
+    "JobCancelled",
+    "JobRunner",
+    "MultiScheduleConfig",
+    "MultiScheduleResult",
+    "Ratings",
+    "ResultCache",
+    "ScheduleConstraints",
+    "StringGAConfig",
+    "StringGAResult",
+    "StringGAStats",
+    "TSPConfig",
+    "TSPResult",
+    "TVConfig",
+    "TVResult",
+    "broadcast_ratings",
+    "crossover_offspring",
+    "default_cache",
+    "default_runner",
+    "distance_matrix",
+    "evolve_schedules",
+    "evolve_string",
+    "evolve_strings",
+    "evolve_tours",
+    "greedy_schedule",
+    "improve_tour",
+    "index_dtype",
+    "island_schedule",
+    "island_string",
+    "island_tsp",
+    "load_ratings",
+    "migrate",
+    "nearest_neighbours",
+    "one_point_crossover",
+    "optimize_schedule",
+    "or_opt",
+    "order_crossover",
+    "random_tours",
+    "refine_elite",
+    "run_islands",
+    "run_solver_job",
+    "run_string_job",
+    "schedule_programs",
+    "select_parents",
+    "solve_string",
+    "solve_tsp",
+    "stable_key",
+    "swap_mutation",
+    "throttled",
+    "tour_lengths",
+    "two_opt",
+]
@@ -0,0 +1,285 @@
+"""
+Result cache for solver runs, keyed on a stable hash of the solver and its
+inputs (problem data, config, seed). Results live in an in-memory LRU and,
+optionally, in a directory of pickles that survives server restarts.
+"""
+import dataclasses
+import functools
+import hashlib
+import os
+import pickle
+import struct
+import tempfile
+import threading
+import types
+from collections import OrderedDict
+
+import numpy as np
+
+# bump to drop every on-disk entry written by older code
+CACHE_VERSION = 1
+
+_default = None
+_default_lock = threading.Lock()
+
+
+def _feed_code(hasher, code):
+    hasher.update(f"o{code.co_name}:".encode() + code.co_code)
+    _feed(hasher, code.co_names)
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            _feed_code(hasher, const)
+        elif isinstance(const, frozenset):
+            # set order depends on the process's hash seed
+            hasher.update(f"frozenset:{sorted(map(repr, const))!r};".encode())
+        else:
+            hasher.update(f"{type(const).__name__}:{const!r};".encode())
+
+
+def _feed_function(hasher, fn):
+    # the qualified name alone is shared by every lambda of a module and every
+    # closure of a factory, so the code, defaults and closed-over values count
+    hasher.update(f"c{fn.__module__}.{fn.__qualname__}(".encode())
+    _feed_code(hasher, fn.__code__)
+    _feed(hasher, fn.__defaults__)
+    _feed(hasher, fn.__kwdefaults__)
+    for cell in fn.__closure__ or ():
+        try:
+            _feed(hasher, cell.cell_contents)
+        except ValueError:
+            # a cell that is not assigned yet
+            hasher.update(b"empty;")
+    hasher.update(b")")
+
+
+def _feed(hasher, obj):
+    # every value is tagged with its type so that e.g. 1, 1.0, "1" and [1]
+    # hash differently
+    if obj is None or isinstance(obj, bool):
+        hasher.update(f"{obj!r};".encode())
+    elif isinstance(obj, int):
+        hasher.update(f"i{obj};".encode())
+    elif isinstance(obj, float):
+        hasher.update(b"f" + struct.pack("<d", obj))
+    elif isinstance(obj, str):
+        data = obj.encode()
+        hasher.update(f"s{len(data)}:".encode() + data)
+    elif isinstance(obj, bytes):
+        hasher.update(f"b{len(obj)}:".encode() + obj)
+    elif isinstance(obj, np.ndarray):
+        hasher.update(f"a{obj.dtype.str}{obj.shape}:".encode())
+        hasher.update(np.ascontiguousarray(obj).tobytes())
+    elif isinstance(obj, np.generic):
+        _feed(hasher, obj.item())
+    elif hasattr(obj, "cache_key_parts"):
+        hasher.update(f"k{type(obj).__module__}.{type(obj).__qualname__}".encode())
+        _feed(hasher, obj.cache_key_parts())
+    elif dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        hasher.update(f"d{type(obj).__module__}.{type(obj).__qualname__}(".encode())
+        for field in dataclasses.fields(obj):
+            _feed(hasher, field.name)
+            _feed(hasher, getattr(obj, field.name))
+        hasher.update(b")")
+    elif isinstance(obj, dict):
+        items = sorted((stable_key(key), value) for key, value in obj.items())
+        hasher.update(f"m{len(items)}(".encode())
+        for key, value in items:
+            hasher.update(key.encode())
+            _feed(hasher, value)
+        hasher.update(b")")
+    elif isinstance(obj, (list, tuple)):
+        hasher.update(f"{'l' if isinstance(obj, list) else 't'}{len(obj)}(".encode())
+        for item in obj:
+            _feed(hasher, item)
+        hasher.update(b")")
+    elif isinstance(obj, types.FunctionType):
+        _feed_function(hasher, obj)
+    elif isinstance(obj, types.MethodType):
+        hasher.update(b"M")
+        _feed(hasher, obj.__self__)
+        _feed(hasher, obj.__func__)
+    elif isinstance(obj, functools.partial):
+        hasher.update(b"P(")
+        _feed(hasher, obj.func)
+        _feed(hasher, obj.args)
+        _feed(hasher, obj.keywords)
+        hasher.update(b")")
+    elif callable(obj) and hasattr(obj, "__module__") and hasattr(obj, "__qualname__"):
+        # builtins, classes and numpy functions: no Python code to hash
+        hasher.update(f"c{obj.__module__}.{obj.__qualname__};".encode())
+    else:
+        raise TypeError(f"Cannot build a cache key from {type(obj).__name__}")
+
+
+def stable_key(*parts):
+    """
+    Hex digest identifying parts across processes and runs; supports None,
+    numbers, strings, bytes, numpy arrays, dataclasses, dicts, lists, tuples,
+    functions (by name, bytecode, defaults and closure), functools.partial
+    objects, builtins and classes (by qualified name) and objects with a cache_key_parts method
+    """
+    hasher = hashlib.sha256()
+    _feed(hasher, parts)
+    return hasher.hexdigest()
+
+
+class ResultCache:
+    """
+    Two-tier LRU cache of solver results
+    Input:
+    1- Maximum number of results kept in memory
+    2- Directory for the on-disk tier (optional)
+    3- Maximum total size of the on-disk tier in bytes
+    4- Salt of the on-disk file names, e.g. a hash of the solver code, so
+       entries written by other code are never read (optional)
+    """
+
+    def __init__(self, max_entries=128, directory=None, max_disk_bytes=256 * 2**20, salt=""):
+        self.max_entries = max_entries
+        self.directory = directory
+        self.max_disk_bytes = max_disk_bytes
+        self.salt = stable_key(CACHE_VERSION, salt)[:16]
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        # entries of other salts just miss and age out through _evict_disk
+        return os.path.join(self.directory, f"{key}-{self.salt}.pkl")
+
+    def get(self, key, default=None):
+        """
+        Cached value of key, or default; counts a hit or a miss
+        """
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return self._memory[key]
+
+        if self.directory is not None:
+            try:
+                with open(self._path(key), "rb") as file:
+                    value = pickle.load(file)
+            except (OSError, pickle.UnpicklingError, EOFError):
+                pass
+            else:
+                # touching the file keeps it from being the next evicted
+                try:
+                    os.utime(self._path(key))
+                except FileNotFoundError:
+                    pass
+                with self._lock:
+                    self.hits += 1
+                    self.disk_hits += 1
+                    self._remember(key, value)
+                return value
+
+        with self._lock:
+            self.misses += 1
+        return default
+
+    def put(self, key, value):
+        with self._lock:
+            self._remember(key, value)
+        if self.directory is not None:
+            self._write(key, value)
+
+    def _remember(self, key, value):
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _write(self, key, value):
+        # written to a temporary file first, so readers never see half a pickle
+        descriptor, temp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(descriptor, "wb") as file:
+                pickle.dump(value, file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, self._path(key))
+        except BaseException:
+            os.remove(temp_path)
+            raise
+        self._evict_disk()
+
+    def _evict_disk(self):
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".pkl"):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_disk_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def call(self, fn, *args, **kwargs):
+        """
+        fn(*args, **kwargs), computed only if this call is not cached yet
+        """
+        key = stable_key(fn, args, kwargs)
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            value = fn(*args, **kwargs)
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+        if self.directory is not None:
+            for entry in os.scandir(self.directory):
+                if entry.name.endswith(".pkl"):
+                    os.remove(entry.path)
+
+    def stats(self):
+        """
+        Hit / miss counters and current sizes
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "entries": len(self._memory),
+            }
+
+
+def source_fingerprint(package_dir=os.path.dirname(os.path.abspath(__file__))):
+    """
+    Hash of the Python sources of a package directory, so that an on-disk
+    cache is dropped whenever the solver code changes
+    """
+    hasher = hashlib.sha256()
+    for name in sorted(os.listdir(package_dir)):
+        if name.endswith(".py"):
+            with open(os.path.join(package_dir, name), "rb") as file:
+                data = file.read()
+            hasher.update(f"{name}:{len(data)}:".encode() + data)
+    return hasher.hexdigest()
+
+
+def default_cache():
+    """
+    Process-wide cache shared by every page and session; set GA_CACHE_DIR to
+    also keep results on disk. Disk entries are salted with the ga sources
+    """
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = ResultCache(directory=os.environ.get("GA_CACHE_DIR"), salt=source_fingerprint())
+        return _default
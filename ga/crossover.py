@@ -0,0 +1,104 @@
+import numpy as np
+
+
+def _positions(tours):
+    """
+    Inverse permutation of every tour: positions[b, city] is where the city
+    appears in tours[b]
+    """
+    positions = np.empty_like(tours)
+    order = np.broadcast_to(np.arange(tours.shape[1], dtype=tours.dtype), tours.shape)
+    np.put_along_axis(positions, tours.astype(np.intp), order, axis=1)
+    return positions
+
+
+def one_point_crossover(parents_1, parents_2, cuts):
+    """
+    Batched version of the pages' simple crossover: every child keeps the
+    first cut cities of its first parent, followed by the remaining cities in
+    the order they appear in the second parent.
+    Input:
+    1- Array of first parents, shape (n_pairs, n_cities)
+    2- Array of second parents, same shape
+    3- Cut point of every pair, shape (n_pairs,)
+    Output:
+    Array of children, same shape as the parents
+    """
+    n_cities = parents_1.shape[1]
+    cuts = np.asarray(cuts)[:, None]
+    from_head = np.arange(n_cities) < cuts
+    in_head = np.take_along_axis(_positions(parents_1), parents_2.astype(np.intp), axis=1) < cuts
+
+    # exactly n_cities candidates survive in every row, so the boolean
+    # gather can be reshaped straight back into tours
+    candidates = np.concatenate((parents_1, parents_2), axis=1)
+    keep = np.concatenate((from_head, ~in_head), axis=1)
+    return candidates[keep].reshape(parents_1.shape)
+
+
+def order_crossover(parents_1, parents_2, starts, ends):
+    """
+    Batched order crossover (OX): every child copies the segment
+    [start, end) of its first parent in place and fills the other positions,
+    starting after the segment and wrapping around, with the remaining cities
+    in the order they appear in the second parent from the same position.
+    Input:
+    1- Array of first parents, shape (n_pairs, n_cities)
+    2- Array of second parents, same shape
+    3- Segment start of every pair, shape (n_pairs,)
+    4- Segment end of every pair, shape (n_pairs,)
+    Output:
+    Array of children, same shape as the parents
+    """
+    n_cities = parents_1.shape[1]
+    cols = np.arange(n_cities)
+    ends = np.asarray(ends)[:, None]
+    segment_len = ends - np.asarray(starts)[:, None]
+
+    # rotate both parents so they start right after the segment; the segment
+    # then sits at the end of the rotated first parent
+    shift = (cols + ends) % n_cities
+    rotated_1 = np.take_along_axis(parents_1, shift, axis=1)
+    rotated_2 = np.take_along_axis(parents_2, shift, axis=1)
+    from_segment = cols >= n_cities - segment_len
+    in_segment = np.take_along_axis(_positions(rotated_1), rotated_2.astype(np.intp), axis=1) >= n_cities - segment_len
+
+    candidates = np.concatenate((rotated_2, rotated_1), axis=1)
+    keep = np.concatenate((~in_segment, from_segment), axis=1)
+    children = np.empty_like(parents_1)
+    np.put_along_axis(children, shift, candidates[keep].reshape(parents_1.shape), axis=1)
+    return children
+
+
+def crossover_offspring(parents, rng=None, method="one_point", out=None):
+    """
+    Mating every consecutive pair of parents in one vectorized pass
+    Input:
+    1- Array of parents, shape (2 * n_pairs, n_cities); rows 2i and 2i+1 mate
+    2- numpy random Generator (optional)
+    3- "one_point" (the pages' simple crossover) or "ox" (order crossover)
+    4- Output array of the same shape as parents (optional)
+    Output:
+    Array of offspring; rows 2i and 2i+1 are the two children of pair i
+    """
+    rng = np.random.default_rng() if rng is None else rng
+    out = np.empty_like(parents) if out is None else out
+    parents_1 = parents[0::2]
+    parents_2 = parents[1::2]
+    n_pairs, n_cities = parents_1.shape
+
+    if n_cities < 2:
+        out[...] = parents
+        return out
+
+    if method == "one_point":
+        cuts = rng.integers(1, n_cities, n_pairs)
+        out[0::2] = one_point_crossover(parents_1, parents_2, cuts)
+        out[1::2] = one_point_crossover(parents_2, parents_1, cuts)
+    elif method == "ox":
+        bounds = np.sort(rng.integers(0, n_cities + 1, (n_pairs, 2)), axis=1)
+        out[0::2] = order_crossover(parents_1, parents_2, bounds[:, 0], bounds[:, 1])
+        out[1::2] = order_crossover(parents_2, parents_1, bounds[:, 0], bounds[:, 1])
+    else:
+        raise ValueError(f"Unknown crossover method: {method}")
+    return out
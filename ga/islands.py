@@ -0,0 +1,153 @@
+"""
+Island model: several sub-populations evolve independently in a process
+pool and periodically exchange their best individuals.
+
+Populations live in one shared memory block of shape
+(n_islands, n_population, n_genes), so workers evolve their island in place
+and nothing but seeds and statistics crosses the process boundary. Problem
+data (e.g. the distance matrix) is sent to each worker once, when the pool
+starts.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+# per-worker state, set by _init_worker
+_worker = {}
+
+
+def _init_worker(shm_name, shape, dtype, evolve, cost, problem, options):
+    _worker.update(shm_name=shm_name, shape=shape, dtype=dtype, evolve=evolve, cost=cost, problem=problem,
+                   options=options)
+
+
+def _evolve_island(island, n_generations, seed):
+    # attached per task, so the mapping is always closed again
+    shm = shared_memory.SharedMemory(name=_worker["shm_name"])
+    populations = None
+    try:
+        populations = np.ndarray(_worker["shape"], dtype=_worker["dtype"], buffer=shm.buf)
+        rng = np.random.default_rng(seed)
+        _worker["evolve"](populations[island], n_generations, rng, **_worker["problem"], **_worker["options"])
+        costs = _worker["cost"](populations[island], **_worker["problem"])
+        return float(costs.min()), float(costs.mean())
+    finally:
+        # the buffer cannot be closed while an array still views it
+        del populations
+        shm.close()
+
+
+def migration_targets(n_islands, topology="ring"):
+    """
+    Islands each island sends its migrants to
+    Input:
+    1- Number of islands
+    2- "ring" (to the next island) or "full" (to every other island)
+    Output:
+    List of target island lists
+    """
+    if topology == "ring":
+        return [[(i + 1) % n_islands] if n_islands > 1 else [] for i in range(n_islands)]
+    if topology == "full":
+        return [[j for j in range(n_islands) if j != i] for i in range(n_islands)]
+    raise ValueError(f"Unknown topology: {topology}")
+
+
+def migrate(populations, costs, n_migrants, topology="ring"):
+    """
+    Copying the n_migrants best individuals of every island over the worst
+    individuals of its target islands, in place
+    Input:
+    1- Array of populations, shape (n_islands, n_population, n_genes)
+    2- Costs of every individual, shape (n_islands, n_population), lower is better
+    3- Number of migrants each island sends to each target
+    4- Migration topology
+    """
+    n_islands, n_population = costs.shape
+    order = np.argsort(costs, axis=1)
+    # take every migrant before overwriting anything
+    migrants = [populations[i, order[i, :n_migrants]].copy() for i in range(n_islands)]
+    migrant_costs = [costs[i, order[i, :n_migrants]].copy() for i in range(n_islands)]
+
+    incoming = [[] for _ in range(n_islands)]
+    for source, targets in enumerate(migration_targets(n_islands, topology)):
+        for target in targets:
+            incoming[target].append(source)
+
+    for target, sources in enumerate(incoming):
+        if not sources:
+            continue
+        arrivals = np.concatenate([migrants[source] for source in sources])
+        arrival_costs = np.concatenate([migrant_costs[source] for source in sources])
+        # the target's own n_migrants best are never replaced; when more
+        # migrants arrive than there are slots left, the best of them win
+        n_slots = min(len(arrivals), n_population - n_migrants)
+        if n_slots <= 0:
+            continue
+        chosen = np.argsort(arrival_costs, kind="stable")[:n_slots]
+        # one distinct slot per migrant, from the worst individual up
+        slots = order[target, ::-1][:n_slots]
+        populations[target, slots] = arrivals[chosen]
+        costs[target, slots] = arrival_costs[chosen]
+
+
+def run_islands(evolve, cost, populations, n_epochs, migration_interval=10, n_migrants=2,
+                topology="ring", processes=None, seed=None, problem=None, options=None):
+    """
+    Running the island model
+    Input:
+    1- evolve(population, n_generations, rng, **problem, **options): evolves
+       one island in place; must be a module-level function so workers can
+       import it
+    2- cost(population, **problem): array of costs, lower is better
+    3- Initial populations, shape (n_islands, n_population, n_genes)
+    4- Number of epochs; every epoch runs migration_interval generations on
+       each island and then migrates
+    5- Number of best individuals sent to each target island per migration
+    6- "ring" or "full" topology
+    7- Number of worker processes (defaults to one per island)
+    8- Seed for reproducible runs (optional)
+    9- Problem data, passed to evolve and cost as keyword arguments
+    10- Extra keyword arguments for evolve only (rates, methods, ...)
+    Output:
+    Dict with the global best individual and cost, the final populations and
+    per-island statistics (best and mean cost after every epoch)
+    """
+    problem = problem or {}
+    options = options or {}
+    populations = np.ascontiguousarray(populations)
+    n_islands = len(populations)
+    island_seeds = np.random.SeedSequence(seed).spawn(n_islands)
+    history = np.empty((n_epochs, n_islands, 2))
+
+    shm = shared_memory.SharedMemory(create=True, size=max(populations.nbytes, 1))
+    try:
+        shared = np.ndarray(populations.shape, dtype=populations.dtype, buffer=shm.buf)
+        shared[...] = populations
+        init_args = (shm.name, populations.shape, populations.dtype, evolve, cost, problem, options)
+        with ProcessPoolExecutor(processes or n_islands, initializer=_init_worker, initargs=init_args) as pool:
+            for epoch in range(n_epochs):
+                tasks = [pool.submit(_evolve_island, i, migration_interval, island_seeds[i].spawn(1)[0])
+                         for i in range(n_islands)]
+                history[epoch] = [task.result() for task in tasks]
+                if epoch < n_epochs - 1 and n_migrants > 0:
+                    costs = np.stack([cost(shared[i], **problem) for i in range(n_islands)])
+                    migrate(shared, costs, n_migrants, topology)
+
+        final = shared.copy()
+    finally:
+        shm.close()
+        shm.unlink()
+
+    costs = np.stack([cost(final[i], **problem) for i in range(n_islands)])
+    best_island, best_index = np.unravel_index(np.argmin(costs), costs.shape)
+    return {
+        "best": final[best_island, best_index],
+        "best_cost": float(costs[best_island, best_index]),
+        "populations": final,
+        "islands": [
+            {"best_cost": history[:, i, 0], "mean_cost": history[:, i, 1]}
+            for i in range(n_islands)
+        ],
+    }
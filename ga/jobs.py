@@ -0,0 +1,232 @@
+"""
+Background jobs for long solver runs. A JobRunner owns a thread or process
+pool shared by every caller (e.g. every Streamlit session on a server) and
+hands out string job IDs, so a page can keep the ID in st.session_state and
+poll for progress and results across reruns.
+
+Job functions take a JobContext as their first argument. They publish
+progress with context.report, which also raises JobCancelled once the job
+has been cancelled, so cancellation takes effect at the next report.
+"""
+import contextlib
+import multiprocessing
+import sys
+import threading
+import time
+import types
+import uuid
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any
+
+from ga.progress import throttled
+from ga.strings import StringGAResult, evolve_string
+
+_default = None
+_default_lock = threading.Lock()
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class JobContext:
+    """
+    Handle given to a running job. Both attributes are plain threading
+    objects for thread pools and multiprocessing.Manager proxies for process
+    pools, so the context can be pickled into a worker process.
+    """
+
+    def __init__(self, cancel_event, progress):
+        self._cancel_event = cancel_event
+        self._progress = progress
+
+    def cancel(self):
+        self._cancel_event.set()
+
+    def cancelled(self):
+        return self._cancel_event.is_set()
+
+    def latest(self):
+        return self._progress.get("latest")
+
+    def report(self, progress):
+        self._progress["latest"] = progress
+        if self.cancelled():
+            raise JobCancelled()
+
+
+@contextlib.contextmanager
+def _empty_main():
+    # Streamlit runs every page as the __main__ module, and spawned processes
+    # run their parent's __main__ script again on start-up; the Manager and
+    # the pool workers are started with an empty one instead, so they do not
+    # execute the page (and submit jobs of their own)
+    main = sys.modules.get("__main__")
+    sys.modules["__main__"] = types.ModuleType("__main__")
+    try:
+        yield
+    finally:
+        sys.modules["__main__"] = main
+
+
+@dataclass
+class _Job:
+    future: Any
+    context: JobContext
+
+
+def run_string_job(context, config, interval=0.2):
+    """
+    Job function for the string GA
+    Input:
+    1- JobContext
+    2- StringGAConfig
+    3- Minimum number of seconds between progress reports (optional)
+    Output:
+    (StringGAResult, FitnessHistory); progress is the latest
+    (StringGAStats, FitnessHistory)
+    """
+    stats, history = throttled(evolve_string(config), lambda stats, history: context.report((stats, history)),
+                               interval)
+    return StringGAResult(stats.best, stats.fitness, stats.generation, stats.fitness == 0), history
+
+
+def run_solver_job(context, solver, *args, interval=0.2):
+    """
+    Job function for solvers that take an on_generation(generation, best)
+    callback (solve_tsp, schedule_programs, optimize_schedule)
+    Input:
+    1- JobContext
+    2- Solver; a module-level function, so process workers can import it
+    3- The solver's positional arguments
+    4- Minimum number of seconds between progress reports (optional)
+    Output:
+    The solver's result; progress is the latest (generation, best)
+    """
+    last = None
+
+    def on_generation(generation, best):
+        nonlocal last
+        now = time.monotonic()
+        if last is None or now - last >= interval:
+            last = now
+            context.report((generation, best))
+
+    return solver(*args, on_generation=on_generation)
+
+
+class JobRunner:
+    """
+    Pool of workers running jobs in the background
+    Input:
+    1- "thread" or "process"
+    2- Number of workers (optional, the executor's default)
+    3- Number of finished jobs kept before the oldest ones are dropped
+    """
+
+    def __init__(self, kind="thread", max_workers=None, max_finished=100):
+        if kind == "thread":
+            self._manager = None
+            self._executor = ThreadPoolExecutor(max_workers)
+        elif kind == "process":
+            context = multiprocessing.get_context("spawn")
+            with _empty_main():
+                self._manager = context.Manager()
+            self._executor = ProcessPoolExecutor(max_workers, mp_context=context)
+        else:
+            raise ValueError(f"Unknown job runner kind: {kind}")
+        self._max_finished = max_finished
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, fn, *args, **kwargs):
+        """
+        Queueing fn(context, *args, **kwargs)
+        Output:
+        Job ID
+        """
+        if self._manager is None:
+            context = JobContext(threading.Event(), {})
+        else:
+            context = JobContext(self._manager.Event(), self._manager.dict())
+        job_id = uuid.uuid4().hex
+        # the pool starts its workers on the first submit
+        starting = _empty_main() if self._manager is not None else contextlib.nullcontext()
+        with self._lock, starting:
+            self._prune()
+            self._jobs[job_id] = _Job(self._executor.submit(fn, context, *args, **kwargs), context)
+        return job_id
+
+    def _job(self, job_id):
+        with self._lock:
+            if job_id not in self._jobs:
+                raise KeyError(f"Unknown job: {job_id}")
+            return self._jobs[job_id]
+
+    def status(self, job_id):
+        """
+        "pending", "running", "done", "failed" or "cancelled"
+        """
+        future = self._job(job_id).future
+        if future.cancelled():
+            return "cancelled"
+        if not future.done():
+            return "running" if future.running() else "pending"
+        error = future.exception()
+        if error is None:
+            return "done"
+        return "cancelled" if isinstance(error, JobCancelled) else "failed"
+
+    def progress(self, job_id):
+        """
+        Latest progress reported by the job, None before the first report
+        """
+        return self._job(job_id).context.latest()
+
+    def result(self, job_id):
+        """
+        Return value of a finished job; re-raises the job's exception
+        """
+        return self._job(job_id).future.result(timeout=0)
+
+    def cancel(self, job_id):
+        job = self._job(job_id)
+        job.context.cancel()
+        job.future.cancel()
+
+    def forget(self, job_id):
+        """
+        Cancelling a job and dropping it from the runner; unknown IDs are
+        ignored
+        """
+        with self._lock:
+            job = self._jobs.pop(job_id, None)
+        if job is not None:
+            job.context.cancel()
+            job.future.cancel()
+
+    def _prune(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job.future.done()]
+        for job_id in finished[:max(len(finished) - self._max_finished + 1, 0)]:
+            del self._jobs[job_id]
+
+    def shutdown(self):
+        for job in list(self._jobs.values()):
+            job.context.cancel()
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        if self._manager is not None:
+            self._manager.shutdown()
+
+
+def default_runner():
+    """
+    Process-wide process-pool runner shared by every page and session, so a
+    server runs one pool (and one Manager process) however many pages submit
+    jobs
+    """
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = JobRunner("process")
+        return _default
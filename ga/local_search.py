@@ -0,0 +1,178 @@
+import numpy as np
+
+from ga.tour import tour_lengths
+
+# moves must gain at least this much, so float noise cannot cycle forever
+_EPSILON = 1e-9
+
+
+def nearest_neighbours(dist, k=8):
+    """
+    Candidate lists for the local search: the k closest cities of every city
+    Input:
+    1- Distance matrix
+    2- Number of neighbours per city
+    Output:
+    Integer array of shape (n_cities, k), closest first
+    """
+    n_cities = len(dist)
+    k = min(k, n_cities - 1)
+    if k <= 0:
+        return np.empty((n_cities, 0), dtype=np.intp)
+    masked = dist + np.diag(np.full(n_cities, np.inf))
+    closest = np.argpartition(masked, k - 1, axis=1)[:, :k]
+    order = np.argsort(np.take_along_axis(masked, closest, axis=1), axis=1)
+    return np.take_along_axis(closest, order, axis=1)
+
+
+def two_opt(tour, dist, neighbours, max_passes=None):
+    """
+    Improving a tour with 2-opt moves, in place. For every edge (a, b) only
+    the neighbours c of a are tried as the new edge (a, c); each move is
+    scored with its O(1) change in length instead of re-measuring the tour.
+    Input:
+    1- Tour, integer array of city indices
+    2- Distance matrix
+    3- Nearest neighbour lists
+    4- Maximum number of sweeps over the tour (optional)
+    Output:
+    True if the tour was improved
+    """
+    n_cities = len(tour)
+    positions = np.empty(n_cities, dtype=np.intp)
+    positions[tour] = np.arange(n_cities)
+    improved_any = False
+    passes = 0
+
+    improved = True
+    while improved and (max_passes is None or passes < max_passes):
+        improved = False
+        passes += 1
+        for i in range(n_cities):
+            a = tour[i]
+            b = tour[(i + 1) % n_cities]
+            cs = neighbours[a]
+            js = positions[cs]
+            ds = tour[(js + 1) % n_cities]
+            delta = dist[a, cs] + dist[b, ds] - dist[a, b] - dist[cs, ds]
+            best = np.argmin(delta)
+            if delta[best] >= -_EPSILON:
+                continue
+
+            # reconnect a-c and b-d by reversing whichever side lies
+            # between them without wrapping
+            j = js[best]
+            lo, hi = (i + 1, j) if i < j else (j + 1, i)
+            tour[lo:hi + 1] = tour[lo:hi + 1][::-1].copy()
+            positions[tour[lo:hi + 1]] = np.arange(lo, hi + 1)
+            improved = improved_any = True
+
+    return improved_any
+
+
+def or_opt(tour, dist, neighbours, segment_lengths=(1, 2, 3), max_passes=None):
+    """
+    Improving a tour with Or-opt moves, in place: segments of 1 to 3 cities
+    are moved, forwards or reversed, next to one of the nearest neighbours of
+    their first city. Moves are scored with their O(1) change in length.
+    Input:
+    1- Tour, integer array of city indices
+    2- Distance matrix
+    3- Nearest neighbour lists
+    4- Segment lengths to try (optional)
+    5- Maximum number of sweeps over the tour (optional)
+    Output:
+    True if the tour was improved
+    """
+    n_cities = len(tour)
+    positions = np.empty(n_cities, dtype=np.intp)
+    positions[tour] = np.arange(n_cities)
+    improved_any = False
+    passes = 0
+
+    improved = True
+    while improved and (max_passes is None or passes < max_passes):
+        improved = False
+        passes += 1
+        for length in segment_lengths:
+            if length > n_cities - 3:
+                continue
+            for i in range(n_cities):
+                first = tour[i]
+                last = tour[(i + length - 1) % n_cities]
+                before = tour[i - 1]
+                after = tour[(i + length) % n_cities]
+                removal_gain = dist[before, first] + dist[last, after] - dist[before, after]
+
+                # insert between c and its successor (first next to c), or
+                # reversed between c's predecessor and c (first next to c)
+                cs = neighbours[first]
+                js = positions[cs]
+                inside = (js - i) % n_cities < length
+                succ = tour[(js + 1) % n_cities]
+                pred = tour[js - 1]
+                forward = dist[cs, first] + dist[last, succ] - dist[cs, succ]
+                backward = dist[pred, last] + dist[first, cs] - dist[pred, cs]
+                forward[inside | (cs == before)] = np.inf
+                backward[inside | (cs == after)] = np.inf
+
+                k_forward = np.argmin(forward)
+                k_backward = np.argmin(backward)
+                reverse = backward[k_backward] < forward[k_forward]
+                k = k_backward if reverse else k_forward
+                cost = backward[k] if reverse else forward[k]
+                if cost - removal_gain >= -_EPSILON:
+                    continue
+
+                segment_idx = (i + np.arange(length)) % n_cities
+                segment = tour[segment_idx]
+                rest = np.delete(tour, segment_idx)
+                anchor = int(np.flatnonzero(rest == cs[k])[0])
+                if reverse:
+                    rest = np.concatenate((rest[:anchor], segment[::-1], rest[anchor:]))
+                else:
+                    rest = np.concatenate((rest[:anchor + 1], segment, rest[anchor + 1:]))
+                tour[:] = rest
+                positions[tour] = np.arange(n_cities)
+                improved = improved_any = True
+
+    return improved_any
+
+
+def improve_tour(tour, dist, neighbours, max_passes=None):
+    """
+    Alternating 2-opt and Or-opt on a tour, in place, until neither finds an
+    improving move (or max_passes rounds have run)
+    """
+    rounds = 0
+    while max_passes is None or rounds < max_passes:
+        rounds += 1
+        improved = two_opt(tour, dist, neighbours, max_passes=1)
+        improved |= or_opt(tour, dist, neighbours, max_passes=1)
+        if not improved:
+            break
+    return tour
+
+
+def refine_elite(tours, dist, neighbours, n_elite=1, max_passes=1, lengths=None):
+    """
+    Memetic refinement stage: runs the local search on the n_elite shortest
+    tours of a population, in place
+    Input:
+    1- Integer array of tours, one row per individual
+    2- Distance matrix
+    3- Nearest neighbour lists
+    4- Number of best tours to refine
+    5- Rounds of 2-opt + Or-opt per tour
+    6- Known tour lengths (optional); only the refined tours are re-scored
+       and their entries are updated in place
+    Output:
+    Indices of the refined tours
+    """
+    if lengths is None:
+        lengths = tour_lengths(tours, dist)
+    elite = np.argsort(lengths)[:n_elite]
+    for index in elite:
+        improve_tour(tours[index], dist, neighbours, max_passes)
+    lengths[elite] = tour_lengths(tours[elite], dist)
+    return elite
@@ -0,0 +1,258 @@
+"""
+Multi-channel, multi-day TV scheduling. Ratings are a tensor of shape
+(programs, channels, days, slots) and a schedule is an integer array of
+program indices of shape (channels, days, slots). A program may air any
+number of times, subject to constraints:
+
+- min_gap: two airings of a program on one channel are at least this many
+  slots apart, counted along the channel's timeline (days back to back)
+- fixed: programs that must air in given (channel, day, slot) cells
+- no_simultaneous: a program may not air on two channels in the same slot
+
+Fixed cells are never changed by the operators. The other constraints are
+repaired after crossover and mutation, and anything left is penalised in
+the fitness.
+"""
+import time
+from dataclasses import dataclass, field
+from typing import Optional
+
+import numpy as np
+
+from ga.selection import select_parents
+
+
+@dataclass
+class ScheduleConstraints:
+    # 1 allows back-to-back repeats
+    min_gap: int = 1
+    # (channel, day, slot) -> program index
+    fixed: dict = field(default_factory=dict)
+    no_simultaneous: bool = True
+
+
+@dataclass
+class MultiScheduleConfig:
+    population_size: int = 100
+    generations: Optional[int] = 200
+    crossover_rate: float = 0.8
+    # probability of every (non-fixed) cell getting a random program
+    mutation_rate: float = 0.01
+    elitism: int = 2
+    # rating lost per violated constraint; None uses the full rating range + 1
+    penalty: Optional[float] = None
+    repair_rounds: int = 3
+    patience: Optional[int] = None
+    time_budget: Optional[float] = None
+    seed: Optional[int] = None
+
+
+@dataclass
+class MultiScheduleResult:
+    # program indices, shape (channels, days, slots)
+    schedule: np.ndarray
+    total_rating: float
+    violations: int
+    generations: int
+
+
+def broadcast_ratings(matrix, n_channels, n_days):
+    """
+    Read-only (programs, channels, days, slots) view of a (programs, slots)
+    ratings matrix, for when every channel and day rates programs alike
+    """
+    matrix = np.asarray(matrix)
+    return np.broadcast_to(matrix[:, None, None, :], (matrix.shape[0], n_channels, n_days, matrix.shape[1]))
+
+
+def schedule_ratings(schedules, tensor):
+    """
+    Total rating of every schedule
+    Input:
+    1- Program indices, shape (n, channels, days, slots)
+    2- Ratings tensor, shape (programs, channels, days, slots)
+    Output:
+    Array of n total ratings
+    """
+    _, n_channels, n_days, n_slots = tensor.shape
+    channel = np.arange(n_channels)[:, None, None]
+    day = np.arange(n_days)[None, :, None]
+    slot = np.arange(n_slots)[None, None, :]
+    return tensor[schedules, channel, day, slot].sum(axis=(1, 2, 3), dtype=np.float64)
+
+
+def conflicts(schedules, constraints, fixed_mask=None):
+    """
+    Cells that break min_gap or no_simultaneous. Of two clashing airings the
+    later channel / later slot is marked, unless that cell is fixed, in
+    which case the other one is
+    Input:
+    1- Program indices, shape (n, channels, days, slots)
+    2- ScheduleConstraints
+    3- Mask of the fixed cells, shape (channels, days, slots) (optional)
+    Output:
+    Boolean mask of the same shape as schedules
+    """
+    n, n_channels = schedules.shape[:2]
+    # one timeline per channel
+    timeline = schedules.reshape(n, n_channels, -1)
+    fixed = np.zeros(timeline.shape[1:], dtype=bool) if fixed_mask is None else fixed_mask.reshape(n_channels, -1)
+    mask = np.zeros(timeline.shape, dtype=bool)
+    for lag in range(1, min(constraints.min_gap, timeline.shape[2])):
+        clash = timeline[:, :, lag:] == timeline[:, :, :-lag]
+        mask[:, :, lag:] |= clash & ~fixed[:, lag:]
+        mask[:, :, :-lag] |= clash & fixed[:, lag:]
+    if constraints.no_simultaneous:
+        for other in range(1, n_channels):
+            clash = timeline[:, other:] == timeline[:, :-other]
+            mask[:, other:] |= clash & ~fixed[other:]
+            mask[:, :-other] |= clash & fixed[other:]
+    return mask.reshape(schedules.shape)
+
+
+def count_violations(schedules, constraints):
+    return conflicts(schedules, constraints).sum(axis=(1, 2, 3))
+
+
+def _fixed_cells(constraints, shape):
+    mask = np.zeros(shape, dtype=bool)
+    values = np.zeros(shape, dtype=np.int64)
+    for (channel, day, slot), program in constraints.fixed.items():
+        mask[channel, day, slot] = True
+        values[channel, day, slot] = program
+    return mask, values
+
+
+def repair(schedules, constraints, n_programs, rng, rounds=3, fixed_mask=None):
+    """
+    Giving conflicting, non-fixed cells a new random program, rounds times,
+    in place
+    """
+    for _ in range(rounds):
+        mask = conflicts(schedules, constraints, fixed_mask)
+        if fixed_mask is not None:
+            mask &= ~fixed_mask
+        n_conflicts = np.count_nonzero(mask)
+        if not n_conflicts:
+            break
+        schedules[mask] = rng.integers(0, n_programs, n_conflicts)
+    return schedules
+
+
+def greedy_schedule(tensor, constraints=None):
+    """
+    Filling the timeline slot by slot: fixed cells first, then every channel
+    takes its best-rated program that does not break a constraint (or its
+    best-rated program if every one would)
+    Input:
+    1- Ratings tensor, shape (programs, channels, days, slots)
+    2- ScheduleConstraints (optional)
+    Output:
+    Program indices, shape (channels, days, slots)
+    """
+    constraints = constraints or ScheduleConstraints()
+    n_programs, n_channels, n_days, n_slots = tensor.shape
+    fixed_mask, fixed_values = _fixed_cells(constraints, (n_channels, n_days, n_slots))
+    schedule = np.where(fixed_mask, fixed_values, -1).reshape(n_channels, -1)
+    fixed_flat = fixed_mask.reshape(n_channels, -1)
+    ratings = tensor.reshape(n_programs, n_channels, -1)
+
+    for t in range(schedule.shape[1]):
+        for channel in range(n_channels):
+            if fixed_flat[channel, t]:
+                continue
+            allowed = np.ones(n_programs, dtype=bool)
+            # unfilled cells are -1; the upcoming ones can only be fixed cells
+            nearby = schedule[channel, max(t - constraints.min_gap + 1, 0):t + constraints.min_gap]
+            allowed[nearby[nearby >= 0]] = False
+            if constraints.no_simultaneous:
+                airing = schedule[:, t]
+                allowed[airing[airing >= 0]] = False
+            scores = ratings[:, channel, t]
+            candidates = np.flatnonzero(allowed) if allowed.any() else np.arange(n_programs)
+            schedule[channel, t] = candidates[np.argmax(scores[candidates])]
+
+    return schedule.reshape(n_channels, n_days, n_slots)
+
+
+def optimize_schedule(tensor, constraints=None, config=None, on_generation=None):
+    """
+    Scheduling every channel and day with a GA seeded by greedy_schedule
+    Input:
+    1- Ratings tensor, shape (programs, channels, days, slots)
+    2- ScheduleConstraints (optional)
+    3- MultiScheduleConfig (optional)
+    4- on_generation(generation, best_fitness), called after every
+       generation (optional)
+    Output:
+    MultiScheduleResult
+    """
+    constraints = constraints or ScheduleConstraints()
+    config = config or MultiScheduleConfig()
+    if config.generations is None and config.patience is None and config.time_budget is None:
+        raise ValueError("generations=None needs patience or time_budget to stop")
+    rng = np.random.default_rng(config.seed)
+    deadline = None if config.time_budget is None else time.monotonic() + config.time_budget
+    n_programs = tensor.shape[0]
+    shape = tensor.shape[1:]
+    penalty = config.penalty
+    if penalty is None:
+        penalty = float(tensor.max() - tensor.min()) + 1.0
+    fixed_mask, fixed_values = _fixed_cells(constraints, shape)
+
+    def fitness(schedules):
+        return schedule_ratings(schedules, tensor) - penalty * count_violations(schedules, constraints)
+
+    def constrain(schedules):
+        schedules[:, fixed_mask] = fixed_values[fixed_mask]
+        return repair(schedules, constraints, n_programs, rng, config.repair_rounds, fixed_mask)
+
+    size = config.population_size
+    population = rng.integers(0, n_programs, (size,) + shape)
+    population[0] = greedy_schedule(tensor, constraints)
+    constrain(population[1:])
+    scores = fitness(population)
+
+    n_elite = min(config.elitism, size)
+    n_pairs = (size - n_elite + 1) // 2
+    timeline = shape[1] * shape[2]
+    best = scores.max()
+    stale = 0
+    generation = 0
+    while config.generations is None or generation < config.generations:
+        if config.patience is not None and stale >= config.patience:
+            break
+        if deadline is not None and time.monotonic() >= deadline:
+            break
+        generation += 1
+
+        elites = np.argsort(-scores, kind="stable")[:n_elite]
+        parents = select_parents(scores, 2 * n_pairs, rng, "tournament").reshape(2, n_pairs)
+        first = population[parents[0]].reshape(n_pairs, shape[0], -1)
+        second = population[parents[1]].reshape(n_pairs, shape[0], -1)
+
+        # one cut point on the timeline, the same for every channel
+        crossed = rng.random(n_pairs) < config.crossover_rate
+        cuts = np.where(crossed, rng.integers(1, max(timeline, 2), n_pairs), timeline)
+        head = np.arange(timeline) < cuts[:, None, None]
+        children = np.concatenate([np.where(head, first, second), np.where(head, second, first)])
+        children = children.reshape((2 * n_pairs,) + shape)[:size - n_elite]
+
+        mutated = rng.random(children.shape) < config.mutation_rate
+        children[mutated] = rng.integers(0, n_programs, np.count_nonzero(mutated))
+        constrain(children)
+
+        population = np.concatenate([population[elites], children])
+        scores = np.concatenate([scores[elites], fitness(children)])
+
+        if scores.max() > best:
+            best = scores.max()
+            stale = 0
+        else:
+            stale += 1
+        if on_generation is not None:
+            on_generation(generation, float(best))
+
+    winner = population[np.argmax(scores)]
+    return MultiScheduleResult(winner.copy(), float(schedule_ratings(winner[None], tensor)[0]),
+                               int(count_violations(winner[None], constraints)[0]), generation)
@@ -0,0 +1,63 @@
+import math
+
+import numpy as np
+
+# from this many cities on, random tours are not checked for duplicates
+DEDUP_CITIES = 20
+# random keys drawn per argsort call
+_CHUNK_ELEMENTS = 2**20
+
+
+def index_dtype(n_cities):
+    """
+    Smallest integer type that can hold every city index
+    """
+    return np.int16 if n_cities <= np.iinfo(np.int16).max else np.int32
+
+
+def _random_permutations(n_rows, n_cities, rng, out):
+    # argsort of uniform keys, a chunk of rows at a time so the float64 keys
+    # and int64 indices stay small; the random stream is the same as one call
+    chunk = max(1, _CHUNK_ELEMENTS // n_cities)
+    for start in range(0, n_rows, chunk):
+        stop = min(start + chunk, n_rows)
+        out[start:stop] = np.argsort(rng.random((stop - start, n_cities)), axis=1)
+    return out
+
+
+def random_tours(n_cities, n_population, rng=None, unique=True):
+    """
+    Generating random tours directly, without enumerating all the permutations
+    of the cities. Each batch of tours is the argsort of uniform random keys,
+    which gives uniformly distributed permutations. Below DEDUP_CITIES cities
+    duplicates are dropped with np.unique on the rows; above it a repeat is
+    so unlikely (about n_population**2 / n!) that no check is made.
+    Input:
+    1- Number of cities
+    2- Number of population
+    3- numpy random Generator (optional)
+    4- Whether tours must be distinct (optional)
+    Output:
+    Integer array of shape (n_population, n_cities), one tour per row
+    """
+    rng = np.random.default_rng() if rng is None else rng
+    tours = np.empty((n_population, n_cities), dtype=index_dtype(n_cities))
+    if not unique or n_cities >= DEDUP_CITIES:
+        return _random_permutations(n_population, n_cities, rng, tours)
+
+    # there are only n! distinct tours; past that the population has to repeat
+    n_unique = min(n_population, math.factorial(n_cities))
+    kept = tours[:0]
+    while len(kept) < n_unique:
+        batch_size = max(n_unique - len(kept), 16)
+        batch = _random_permutations(batch_size, n_cities, rng, np.empty((batch_size, n_cities), dtype=tours.dtype))
+        candidates = np.concatenate([kept, batch])
+        # first occurrence of every distinct row, in the order they were drawn
+        _, first = np.unique(candidates, axis=0, return_index=True)
+        kept = candidates[np.sort(first)[:n_unique]]
+    tours[:n_unique] = kept
+
+    if n_unique < n_population:
+        tours[n_unique:] = tours[rng.integers(0, n_unique, n_population - n_unique)]
+
+    return tours
@@ -0,0 +1,76 @@
+"""
+Throttled progress reporting for generation-by-generation GA runs. The GA
+keeps running at full speed; the UI callback only sees the latest stats at
+most once per interval, and the full history is kept in compact arrays.
+"""
+import time
+
+import numpy as np
+
+
+class FitnessHistory:
+    """
+    Best and mean fitness of every generation, stored in growable float32
+    arrays instead of one Python object per generation
+    """
+
+    def __init__(self, capacity=1024):
+        self._data = np.empty((capacity, 2), dtype=np.float32)
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def append(self, best, mean):
+        if self._size == len(self._data):
+            grown = np.empty((2 * len(self._data), 2), dtype=np.float32)
+            grown[:self._size] = self._data[:self._size]
+            self._data = grown
+        self._data[self._size] = best, mean
+        self._size += 1
+
+    @property
+    def best(self):
+        return self._data[:self._size, 0]
+
+    @property
+    def mean(self):
+        return self._data[:self._size, 1]
+
+    def to_csv(self):
+        """
+        History as CSV text with one generation per row
+        """
+        rows = (f"{generation},{best:g},{mean:g}" for generation, (best, mean)
+                in enumerate(self._data[:self._size]))
+        return "generation,best_fitness,mean_fitness\n" + "\n".join(rows) + "\n"
+
+
+def throttled(stats, on_update, interval=0.1, clock=time.monotonic):
+    """
+    Consuming a generator of per-generation stats and coalescing UI updates
+    Input:
+    1- Iterable of stats with fitness and mean_fitness attributes
+       (e.g. ga.strings.evolve_string)
+    2- on_update(stats, history), called with the latest stats at most once
+       per interval and always for the last generation
+    3- Minimum number of seconds between updates (optional)
+    Output:
+    (last stats, FitnessHistory)
+    """
+    history = FitnessHistory()
+    last = None
+    last_update = None
+    pending = False
+    for last in stats:
+        history.append(last.fitness, last.mean_fitness)
+        now = clock()
+        if last_update is None or now - last_update >= interval:
+            on_update(last, history)
+            last_update = now
+            pending = False
+        else:
+            pending = True
+    if pending:
+        on_update(last, history)
+    return last, history
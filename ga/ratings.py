@@ -0,0 +1,190 @@
+"""
+Ratings data layer for the TV scheduler. A ratings CSV (program name, then
+one "Hour N" column per time slot) is streamed in chunks into a contiguous
+float32 matrix with a program-name index. A binary copy (.npy matrix plus a
+JSON index) is written next to the CSV and memory-mapped on later loads
+until the CSV changes.
+"""
+import csv
+import json
+import os
+import tempfile
+from collections.abc import Mapping
+
+import numpy as np
+
+CACHE_VERSION = 1
+
+
+class Ratings(Mapping):
+    """
+    Read-only mapping of program -> ratings per time slot, backed by one
+    (programs, slots) float32 matrix; usable wherever the scheduler takes a
+    ratings dict
+    """
+
+    def __init__(self, programs, slots, matrix):
+        self.programs = list(programs)
+        self.slots = list(slots)
+        self.matrix = matrix
+        self.index = {program: i for i, program in enumerate(self.programs)}
+        if len(self.index) != len(self.programs):
+            raise ValueError("Program names must be unique")
+        if matrix.shape != (len(self.programs), len(self.slots)):
+            raise ValueError(f"Matrix shape {matrix.shape} does not match "
+                             f"{len(self.programs)} programs x {len(self.slots)} slots")
+
+    def __getitem__(self, program):
+        return self.matrix[self.index[program]]
+
+    def __iter__(self):
+        return iter(self.programs)
+
+    def __len__(self):
+        return len(self.programs)
+
+    def cache_key_parts(self):
+        # used by ga.cache.stable_key instead of hashing row by row
+        return self.programs, self.slots, self.matrix
+
+    def __repr__(self):
+        return f"Ratings({len(self.programs)} programs x {len(self.slots)} slots)"
+
+
+def _slot_of(column):
+    name, _, hour = column.strip().partition(" ")
+    if name.lower() != "hour" or not hour.isdigit():
+        raise ValueError(f"Expected an 'Hour N' column, got {column!r}")
+    return int(hour)
+
+
+def _validate_header(header, time_slots):
+    if len(header) < 2:
+        raise ValueError("Ratings CSV needs a program column and at least one hour column")
+    slots = [_slot_of(column) for column in header[1:]]
+    if time_slots is not None and slots != list(time_slots):
+        raise ValueError(f"Hour columns {slots} do not match the time slots {list(time_slots)}")
+    return slots
+
+
+def _parse_chunk(rows, first_line, n_slots):
+    for offset, row in enumerate(rows):
+        if len(row) != n_slots + 1:
+            raise ValueError(f"Line {first_line + offset}: expected {n_slots + 1} columns, got {len(row)}")
+    try:
+        return np.array([row[1:] for row in rows], dtype=np.float32)
+    except ValueError:
+        # find the offending row for the error message
+        for offset, row in enumerate(rows):
+            try:
+                np.array(row[1:], dtype=np.float32)
+            except ValueError as error:
+                raise ValueError(f"Line {first_line + offset}: {error}") from None
+        raise
+
+
+def read_ratings_csv(path, time_slots=None, chunk_rows=4096):
+    """
+    Streaming a ratings CSV into a Ratings matrix, chunk_rows rows at a time
+    Input:
+    1- Path of the CSV
+    2- Expected time slots; the hour columns must match them (optional)
+    3- Rows parsed per chunk (optional)
+    Output:
+    Ratings
+    """
+    programs = []
+    n_rows = 0
+    with open(path, newline="") as file:
+        reader = csv.reader(file)
+        try:
+            header = next(reader)
+        except StopIteration:
+            raise ValueError(f"{path} is empty") from None
+        slots = _validate_header(header, time_slots)
+        matrix = np.empty((chunk_rows, len(slots)), dtype=np.float32)
+
+        chunk = []
+        # line 1 is the header
+        first_line = 2
+        for row in reader:
+            if not row:
+                continue
+            chunk.append(row)
+            if len(chunk) == chunk_rows:
+                matrix, n_rows = _append(matrix, n_rows, _parse_chunk(chunk, first_line, len(slots)))
+                programs.extend(row[0] for row in chunk)
+                first_line += len(chunk)
+                chunk = []
+        if chunk:
+            matrix, n_rows = _append(matrix, n_rows, _parse_chunk(chunk, first_line, len(slots)))
+            programs.extend(row[0] for row in chunk)
+
+    return Ratings(programs, slots, matrix[:n_rows].copy())
+
+
+def _append(matrix, n_rows, values):
+    # the buffer doubles when full, so loading stays linear in the row count
+    if n_rows + len(values) > len(matrix):
+        grown = np.empty((max(2 * len(matrix), n_rows + len(values)), matrix.shape[1]), dtype=matrix.dtype)
+        grown[:n_rows] = matrix[:n_rows]
+        matrix = grown
+    matrix[n_rows:n_rows + len(values)] = values
+    return matrix, n_rows + len(values)
+
+
+def _cache_paths(path, cache_dir):
+    directory = os.path.dirname(os.path.abspath(path)) if cache_dir is None else cache_dir
+    base = os.path.join(directory, os.path.basename(path))
+    return base + ".npy", base + ".json"
+
+
+def _write_atomic(path, write):
+    descriptor, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(descriptor, "wb") as file:
+            write(file)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+
+
+def load_ratings(path, time_slots=None, cache=True, cache_dir=None, chunk_rows=4096):
+    """
+    Loading a ratings CSV through its binary cache
+    Input:
+    1- Path of the CSV
+    2- Expected time slots (optional)
+    3- Whether to read and write the binary cache (optional)
+    4- Directory of the cache files, the CSV's directory by default (optional)
+    5- Rows parsed per chunk (optional)
+    Output:
+    Ratings; the matrix is a read-only memory map when it came from the cache
+    """
+    if not cache:
+        return read_ratings_csv(path, time_slots, chunk_rows)
+
+    matrix_path, index_path = _cache_paths(path, cache_dir)
+    source = os.stat(path)
+    stamp = {"version": CACHE_VERSION, "mtime_ns": source.st_mtime_ns, "size": source.st_size}
+    try:
+        with open(index_path) as file:
+            index = json.load(file)
+        if index["source"] == stamp and (time_slots is None or index["slots"] == list(time_slots)):
+            matrix = np.load(matrix_path, mmap_mode="r")
+            return Ratings(index["programs"], index["slots"], matrix)
+    except (OSError, ValueError, KeyError):
+        pass
+
+    ratings = read_ratings_csv(path, time_slots, chunk_rows)
+    try:
+        os.makedirs(os.path.dirname(matrix_path), exist_ok=True)
+        _write_atomic(matrix_path, lambda file: np.save(file, ratings.matrix))
+        index = {"source": stamp, "programs": ratings.programs, "slots": ratings.slots}
+        # the index is written last; it is what marks the cache as valid
+        _write_atomic(index_path, lambda file: file.write(json.dumps(index).encode()))
+    except OSError:
+        # a read-only data directory just means no cache
+        pass
+    return ratings
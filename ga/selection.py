@@ -0,0 +1,67 @@
+import numpy as np
+
+
+def cumulative_distribution(weights):
+    """
+    Building the roulette wheel once per generation
+    Input:
+    1- Non-negative selection weights (e.g. fitness probabilities)
+    Output:
+    Normalised cumulative distribution; uniform if every weight is zero
+    """
+    cdf = np.cumsum(weights, dtype=np.float64)
+    if not cdf[-1] > 0:
+        return np.arange(1, len(cdf) + 1) / len(cdf)
+    return cdf / cdf[-1]
+
+
+def roulette_wheel(cdf, n_select, rng):
+    """
+    Fitness proportionate selection of n_select individuals with one
+    binary search per draw
+    """
+    picks = np.searchsorted(cdf, rng.random(n_select), side="right")
+    return np.minimum(picks, len(cdf) - 1)
+
+
+def stochastic_universal_sampling(cdf, n_select, rng):
+    """
+    Fitness proportionate selection with n_select evenly spaced pointers and a
+    single random offset; the picks are shuffled so that consecutive parents
+    are not always neighbours on the wheel
+    """
+    pointers = (rng.random() + np.arange(n_select)) / n_select
+    picks = np.minimum(np.searchsorted(cdf, pointers, side="right"), len(cdf) - 1)
+    return rng.permutation(picks)
+
+
+def tournament(weights, n_select, rng, size=2):
+    """
+    Picking the fittest of size random contestants, n_select times
+    """
+    weights = np.asarray(weights)
+    contestants = rng.integers(0, len(weights), (n_select, size))
+    winners = np.argmax(weights[contestants], axis=1)
+    return contestants[np.arange(n_select), winners]
+
+
+def select_parents(weights, n_select, rng=None, method="roulette", tournament_size=2):
+    """
+    Implement parent selection for a whole generation at once
+    Input:
+    1- Selection weights, higher is fitter (e.g. fitness probabilities)
+    2- Number of parents to select
+    3- numpy random Generator (optional)
+    4- "roulette", "sus" (stochastic universal sampling) or "tournament"
+    5- Number of contestants per tournament (optional)
+    Output:
+    Integer array of the selected individuals' indices
+    """
+    rng = np.random.default_rng() if rng is None else rng
+    if method == "roulette":
+        return roulette_wheel(cumulative_distribution(weights), n_select, rng)
+    if method == "sus":
+        return stochastic_universal_sampling(cumulative_distribution(weights), n_select, rng)
+    if method == "tournament":
+        return tournament(weights, n_select, rng, tournament_size)
+    raise ValueError(f"Unknown selection method: {method}")
@@ -0,0 +1,292 @@
+"""
+String-matching GA: evolves random strings until one equals the target.
+
+Two engines run the same algorithm. "numpy" keeps the population as a uint8
+matrix of gene indices and does every step on whole arrays; "python" is the
+original list-of-characters version.
+"""
+import dataclasses
+import random
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+from ga.islands import run_islands
+
+GENES = ' abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ'
+
+
+@dataclass
+class StringGAConfig:
+    target: str
+    pop_size: int = 500
+    mutation_rate: float = 0.1
+    genes: str = GENES
+    max_generations: Optional[int] = None
+    seed: Optional[int] = None
+    engine: str = "numpy"
+
+
+@dataclass
+class StringGAStats:
+    generation: int
+    best: str
+    fitness: int
+    # mean mismatch count over the population
+    mean_fitness: float
+
+
+@dataclass
+class StringGAResult:
+    best: str
+    fitness: int
+    generations: int
+    found: bool
+
+
+def initialize_pop(target, pop_size, genes, rng):
+    population = []
+    tar_len = len(target)
+    for _ in range(pop_size):
+        temp = [rng.choice(genes) for _ in range(tar_len)]
+        population.append(temp)
+    return population
+
+
+def fitness_cal(target, chromo_from_pop):
+    difference = sum(1 for tar_char, chromo_char in zip(target, chromo_from_pop) if tar_char != chromo_char)
+    return [chromo_from_pop, difference]
+
+
+def selection(population, pop_size):
+    sorted_chromo_pop = sorted(population, key=lambda x: x[1])
+    return sorted_chromo_pop[:pop_size // 2]
+
+
+def crossover(selected_chromo, chromo_len, population, pop_size, rng):
+    offspring_cross = []
+    for _ in range(pop_size):
+        parent1 = rng.choice(selected_chromo)
+        parent2 = rng.choice(population[:pop_size // 2])
+        crossover_point = rng.randint(1, chromo_len - 1) if chromo_len > 1 else 0
+        child = parent1[0][:crossover_point] + parent2[0][crossover_point:]
+        offspring_cross.append(child)
+    return offspring_cross
+
+
+def mutate(offspring, mutation_rate, genes, rng):
+    for arr in offspring:
+        for i in range(len(arr)):
+            if rng.random() < mutation_rate:
+                arr[i] = rng.choice(genes)
+    return offspring
+
+
+def replace(new_gen, population):
+    for i in range(len(population)):
+        if population[i][1] > new_gen[i][1]:
+            population[i] = new_gen[i]
+    return population
+
+
+def encode(text, genes):
+    """
+    Gene indices of every character of text, as a uint8 array
+    """
+    lookup = {gene: index for index, gene in enumerate(genes)}
+    return np.fromiter((lookup[char] for char in text), dtype=np.uint8, count=len(text))
+
+
+def decode(chromo, genes):
+    return "".join(genes[index] for index in chromo)
+
+
+def fitness_batch(population, target):
+    """
+    Number of mismatched characters of every row of population
+    """
+    return np.count_nonzero(population != target, axis=1)
+
+
+def crossover_batch(parents1, parents2, rng):
+    """
+    One-point crossover of whole parent matrices: each child takes its
+    parent1's genes before a random cut point and its parent2's after it
+    """
+    n_children, chromo_len = parents1.shape
+    if chromo_len > 1:
+        cuts = rng.integers(1, chromo_len, n_children)
+    else:
+        cuts = np.zeros(n_children, dtype=np.int64)
+    head = np.arange(chromo_len) < cuts[:, None]
+    return np.where(head, parents1, parents2)
+
+
+def mutate_batch(offspring, mutation_rate, n_genes, rng):
+    """
+    Replacing every gene with a random one with probability mutation_rate,
+    in place
+    """
+    mask = rng.random(offspring.shape) < mutation_rate
+    offspring[mask] = rng.integers(0, n_genes, np.count_nonzero(mask), dtype=np.uint8)
+    return offspring
+
+
+def next_generation(population, fitness, target, mutation_rate, n_genes, rng):
+    """
+    One generation of the numpy engine: children of parents from the best
+    half replace the individuals they beat
+    Input:
+    1- uint8 population of gene indices, sorted by fitness
+    2- Mismatch count of every individual
+    3- Target as gene indices
+    4- Mutation rate and number of genes
+    5- numpy random Generator
+    Output:
+    (new population, its fitness), sorted again
+    """
+    pop_size = len(population)
+    # the population is kept sorted, so its first half is the selection
+    parents = rng.integers(0, max(pop_size // 2, 1), (2, pop_size))
+    offspring = crossover_batch(population[parents[0]], population[parents[1]], rng)
+    mutate_batch(offspring, mutation_rate, n_genes, rng)
+    offspring_fitness = fitness_batch(offspring, target)
+
+    better = offspring_fitness < fitness
+    population[better] = offspring[better]
+    fitness[better] = offspring_fitness[better]
+    order = np.argsort(fitness, kind="stable")
+    return population[order], fitness[order]
+
+
+def evolve_strings(population, n_generations, rng, target, mutation_rate=0.1, n_genes=len(GENES)):
+    """
+    Evolving a uint8 population of gene indices in place with the numpy
+    engine, for the island model (see island_string); stops early once the
+    target is matched
+    Output:
+    Mismatch count of every individual
+    """
+    fitness = fitness_batch(population, target)
+    order = np.argsort(fitness, kind="stable")
+    sorted_population, fitness = population[order], fitness[order]
+    for _ in range(n_generations):
+        if fitness[0] == 0:
+            break
+        sorted_population, fitness = next_generation(sorted_population, fitness, target, mutation_rate, n_genes, rng)
+    population[...] = sorted_population
+    return fitness
+
+
+def island_string(config, n_islands=4, n_epochs=20, migration_interval=10, n_migrants=2, topology="ring",
+                  processes=None):
+    """
+    Running the string GA with the island model: n_islands populations of
+    config.pop_size random strings are evolved with the numpy engine in a
+    process pool (config.engine and config.max_generations are not used)
+    Input:
+    1- StringGAConfig
+    2- Island model settings (see ga.islands.run_islands)
+    Output:
+    run_islands result; "best" holds gene indices, "best_string" the decoded
+    string and "best_cost" its mismatch count
+    """
+    validate(dataclasses.replace(config, engine="numpy"))
+    rng = np.random.default_rng(config.seed)
+    target = encode(config.target, config.genes)
+    populations = rng.integers(0, len(config.genes), (n_islands, config.pop_size, len(target)), dtype=np.uint8)
+    result = run_islands(evolve_strings, fitness_batch, populations, n_epochs, migration_interval, n_migrants,
+                         topology, processes, config.seed, problem={"target": target},
+                         options={"mutation_rate": config.mutation_rate, "n_genes": len(config.genes)})
+    result["best_string"] = decode(result["best"], config.genes)
+    return result
+
+
+def validate(config):
+    if config.engine not in ("numpy", "python"):
+        raise ValueError(f"Unknown engine: {config.engine}")
+    if not config.target:
+        raise ValueError("Target string must not be empty")
+    if config.engine == "numpy" and len(config.genes) > 256:
+        raise ValueError("The numpy engine supports at most 256 genes")
+    missing = set(config.target) - set(config.genes)
+    if missing:
+        raise ValueError(f"Target uses characters that are not genes: {''.join(sorted(missing))!r}")
+
+
+def evolve_string(config):
+    """
+    Running the string GA one generation at a time
+    Input:
+    StringGAConfig
+    Output:
+    Generator of StringGAStats, starting with the random initial population
+    as generation 0 and stopping once the target is found (or after
+    max_generations)
+    """
+    validate(config)
+    if config.engine == "numpy":
+        return _evolve_numpy(config)
+    return _evolve_python(config)
+
+
+def solve_string(config, on_generation=None):
+    """
+    Running the string GA until the target is found (or max_generations)
+    Input:
+    1- StringGAConfig
+    2- on_generation(generation, best_string, fitness), called after every
+       generation (optional)
+    Output:
+    StringGAResult
+    """
+    for stats in evolve_string(config):
+        if on_generation is not None and stats.generation > 0:
+            on_generation(stats.generation, stats.best, stats.fitness)
+    return StringGAResult(stats.best, stats.fitness, stats.generation, stats.fitness == 0)
+
+
+def _evolve_numpy(config):
+    rng = np.random.default_rng(config.seed)
+    genes = config.genes
+    target = encode(config.target, genes)
+
+    population = rng.integers(0, len(genes), (config.pop_size, len(target)), dtype=np.uint8)
+    fitness = fitness_batch(population, target)
+    order = np.argsort(fitness, kind="stable")
+    population, fitness = population[order], fitness[order]
+    generation = 0
+    yield StringGAStats(generation, decode(population[0], genes), int(fitness[0]), float(fitness.mean()))
+
+    while fitness[0] > 0 and (config.max_generations is None or generation < config.max_generations):
+        generation += 1
+        population, fitness = next_generation(population, fitness, target, config.mutation_rate, len(genes), rng)
+        yield StringGAStats(generation, decode(population[0], genes), int(fitness[0]), float(fitness.mean()))
+
+
+def _evolve_python(config):
+    rng = random.Random(config.seed)
+    target = config.target
+
+    population = [fitness_cal(target, chromo) for chromo in initialize_pop(target, config.pop_size, config.genes, rng)]
+    best = min(population, key=lambda x: x[1])
+    generation = 0
+    yield StringGAStats(generation, "".join(best[0]), best[1], _mean_fitness(population))
+
+    while best[1] > 0 and (config.max_generations is None or generation < config.max_generations):
+        generation += 1
+        selected = selection(population, config.pop_size)
+        crossovered = crossover(selected, len(target), population, config.pop_size, rng)
+        mutated = mutate(crossovered, config.mutation_rate, config.genes, rng)
+        new_gen = [fitness_cal(target, chromo) for chromo in mutated]
+
+        population = replace(new_gen, population)
+        population = sorted(population, key=lambda x: x[1])
+        best = population[0]
+
+        yield StringGAStats(generation, "".join(best[0]), best[1], _mean_fitness(population))
+
+
+def _mean_fitness(population):
+    return sum(chromo[1] for chromo in population) / len(population)
@@ -0,0 +1,27 @@
+import numpy as np
+
+
+def distance_matrix(coords):
+    """
+    Calculating the Euclidean distance between every pair of cities once
+    Input:
+    1- Sequence of (x, y) coordinates, in city index order
+    Output:
+    Array of shape (n_cities, n_cities) of distances
+    """
+    coords = np.asarray(coords, dtype=np.float64)
+    diff = coords[:, None, :] - coords[None, :, :]
+    return np.sqrt((diff ** 2).sum(axis=-1))
+
+
+def tour_lengths(tours, dist):
+    """
+    Calculating the total closed-loop distance of every tour in one gather
+    Input:
+    1- Integer array of tours, shape (n_population, n_cities) or (n_cities,)
+    2- Distance matrix from distance_matrix
+    Output:
+    Array of tour lengths (a scalar for a single tour)
+    """
+    tours = np.asarray(tours)
+    return dist[tours, np.roll(tours, -1, axis=-1)].sum(axis=-1)
@@ -0,0 +1,157 @@
+"""
+Travelling salesman GA over integer tours.
+"""
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+from ga.crossover import crossover_offspring
+from ga.islands import run_islands
+from ga.local_search import nearest_neighbours, refine_elite
+from ga.population import random_tours
+from ga.selection import select_parents
+from ga.tour import distance_matrix, tour_lengths
+
+
+@dataclass
+class TSPConfig:
+    n_population: int = 250
+    n_generations: int = 200
+    crossover_per: float = 0.8
+    mutation_per: float = 0.2
+    # share of every generation replaced by fresh random tours
+    immigrant_per: float = 0.0
+    selection: str = "roulette"
+    crossover: str = "one_point"
+    local_search: bool = False
+    seed: Optional[int] = None
+
+
+@dataclass
+class TSPResult:
+    tour: np.ndarray
+    length: float
+    # shortest tour length after every generation
+    history: np.ndarray
+
+
+def swap_mutation(tours, mutation_per, rng):
+    """
+    Swapping two random cities in each tour with probability mutation_per,
+    in place
+    """
+    rows = np.flatnonzero(rng.random(len(tours)) < mutation_per)
+    cols = rng.integers(0, tours.shape[1], (2, len(rows)))
+    tours[rows, cols[0]], tours[rows, cols[1]] = tours[rows, cols[1]], tours[rows, cols[0]]
+    return tours
+
+
+def evolve_tours(tours, n_generations, rng, dist, crossover_per=0.8, mutation_per=0.2, immigrant_per=0.0,
+                 selection="roulette", crossover="one_point", local_search=False, neighbours=None,
+                 best_lengths=None, on_generation=None):
+    """
+    Evolving a population of tours in place: parents are selected on
+    max-length-minus-length fitness, mated and mutated, and the best
+    len(tours) of parents plus offspring survive
+    Input:
+    1- Integer array of tours, one row per individual (modified in place)
+    2- Number of generations
+    3- numpy random Generator
+    4- Distance matrix
+    5- Crossover, mutation and random immigrant rates, selection and
+       crossover methods
+    6- Whether to refine the best tour with 2-opt / Or-opt each generation
+    7- Array that receives the shortest length of every generation (optional)
+    8- on_generation(generation, best_length), called after every generation
+       (optional)
+    Output:
+    Tour lengths of the final population
+    """
+    n_population, n_cities = tours.shape
+    n_offspring = int(crossover_per * n_population) // 2 * 2
+    n_immigrants = int(immigrant_per * n_population)
+    # the current population (first n_population rows) and its offspring
+    # share one buffer, so survivors are picked from both with a single
+    # gather into the spare buffer, and the two buffers swap roles
+    pool = np.empty((n_population + n_offspring, n_cities), dtype=tours.dtype)
+    spare = np.empty_like(pool)
+    parents = np.empty((n_offspring, n_cities), dtype=tours.dtype)
+    if local_search and neighbours is None:
+        neighbours = nearest_neighbours(dist)
+
+    pool[:n_population] = tours
+    lengths = tour_lengths(tours, dist)
+    for generation in range(n_generations):
+        population = pool[:n_population]
+        parent_indices = select_parents(lengths.max() - lengths, n_offspring, rng, selection)
+        np.take(population, parent_indices, axis=0, out=parents)
+        crossover_offspring(parents, rng, crossover, out=pool[n_population:])
+        swap_mutation(pool[n_population:], mutation_per, rng)
+
+        # only the offspring need scoring, the population's lengths are known
+        pool_lengths = np.concatenate([lengths, tour_lengths(pool[n_population:], dist)])
+        survivors = np.argsort(pool_lengths)[:n_population]
+        np.take(pool, survivors, axis=0, out=spare[:n_population])
+        pool, spare = spare, pool
+        population = pool[:n_population]
+        lengths = pool_lengths[survivors]
+
+        # survivors are sorted, so immigrants replace the longest tours
+        if n_immigrants:
+            population[-n_immigrants:] = random_tours(n_cities, n_immigrants, rng, unique=False)
+            lengths[-n_immigrants:] = tour_lengths(population[-n_immigrants:], dist)
+
+        if local_search:
+            refine_elite(population, dist, neighbours, lengths=lengths)
+
+        if best_lengths is not None:
+            best_lengths[generation] = lengths.min()
+        if on_generation is not None:
+            on_generation(generation + 1, float(lengths.min()))
+
+    tours[:] = pool[:n_population]
+    return lengths
+
+
+def island_tsp(dist, n_islands=4, n_population=250, n_epochs=20, migration_interval=10, n_migrants=2,
+               topology="ring", processes=None, seed=None, **options):
+    """
+    Solving a TSP with the island model: n_islands populations of random
+    tours are evolved with evolve_tours in a process pool
+    Input:
+    1- Distance matrix
+    2- Island model settings (see ga.islands.run_islands)
+    3- Extra evolve_tours options (crossover_per, mutation_per, selection, ...)
+    Output:
+    run_islands result; "best" is the shortest tour found
+    """
+    rng = np.random.default_rng(seed)
+    populations = np.stack([random_tours(len(dist), n_population, rng) for _ in range(n_islands)])
+    return run_islands(evolve_tours, tour_lengths, populations, n_epochs, migration_interval, n_migrants,
+                       topology, processes, seed, problem={"dist": dist}, options=options)
+
+
+def solve_tsp(coords, config=None, on_generation=None):
+    """
+    Solving a TSP with the GA
+    Input:
+    1- Sequence of (x, y) city coordinates
+    2- TSPConfig (optional)
+    3- on_generation(generation, best_length), called after every generation
+       (optional)
+    Output:
+    TSPResult; the tour is an array of city indices into coords
+    """
+    config = config or TSPConfig()
+    rng = np.random.default_rng(config.seed)
+    dist = distance_matrix(coords)
+
+    tours = random_tours(len(dist), config.n_population, rng)
+    history = np.empty(config.n_generations)
+    lengths = evolve_tours(tours, config.n_generations, rng, dist, config.crossover_per, config.mutation_per,
+                           config.immigrant_per, config.selection, config.crossover, config.local_search,
+                           best_lengths=history, on_generation=on_generation)
+
+    best = np.argmin(lengths)
+    return TSPResult(tours[best].copy(), float(lengths[best]), history)
@@ -0,0 +1,411 @@
+"""
+TV program scheduling: assign programs to hourly time slots so that the
+total rating is as high as possible.
+"""
+import csv
+import random
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+from ga.islands import run_islands
+from ga.ratings import Ratings
+
+ALL_TIME_SLOTS = list(range(6, 24))
+
+
+@dataclass
+class TVConfig:
+    crossover_rate: float = 0.8
+    mutation_rate: float = 0.2
+    # how the best ordering of all programs is found: "assignment" (exact,
+    # Hungarian algorithm), "brute_force" (every permutation, small inputs
+    # only) or "ga" (for objectives that are not a sum of ratings)
+    method: str = "assignment"
+    population_size: int = 50
+    # None runs until patience, target_rating or time_budget stops the GA
+    generations: Optional[int] = 100
+    elitism: int = 2
+    # stop after this many generations without a better schedule
+    patience: Optional[int] = None
+    # stop once the best schedule is rated at least this much
+    target_rating: Optional[float] = None
+    # wall-clock limit in seconds for the whole schedule_programs call
+    time_budget: Optional[float] = None
+    seed: Optional[int] = None
+
+
+@dataclass
+class TVResult:
+    schedule: list
+    total_rating: float
+
+
+# Function to read the CSV file and convert it to the desired format
+def read_csv_to_dict(file_path):
+    program_ratings = {}
+    with open(file_path, mode='r', newline='') as file:
+        reader = csv.reader(file)
+        # Skip the header
+        header = next(reader)
+        for row in reader:
+            program = row[0]
+            ratings = [float(x) for x in row[1:]]  # Convert the ratings to floats
+            program_ratings[program] = ratings
+    return program_ratings
+
+
+# defining fitness function
+def fitness_function(schedule, ratings):
+    total_rating = 0
+    for time_slot, program in enumerate(schedule):
+        total_rating += ratings[program][time_slot]
+    return float(total_rating)
+
+
+# initializing the population
+def initialize_pop(programs, time_slots):
+    if not programs:
+        return [[]]
+
+    all_schedules = []
+    for i in range(len(programs)):
+        for schedule in initialize_pop(programs[:i] + programs[i + 1:], time_slots):
+            all_schedules.append([programs[i]] + schedule)
+
+    return all_schedules
+
+
+# selection
+def finding_best_schedule(all_schedules, ratings):
+    best_schedule = []
+    max_ratings = 0
+
+    for schedule in all_schedules:
+        total_ratings = fitness_function(schedule, ratings)
+        if total_ratings > max_ratings:
+            max_ratings = total_ratings
+            best_schedule = schedule
+
+    return best_schedule
+
+
+def linear_assignment(cost):
+    """
+    Hungarian algorithm (shortest augmenting paths with potentials),
+    vectorized over the columns; O(rows^2 * cols)
+    Input:
+    Cost matrix with rows <= cols
+    Output:
+    Column assigned to every row, minimizing the total cost
+    """
+    cost = np.asarray(cost, dtype=np.float64)
+    n_rows, n_cols = cost.shape
+    if n_rows > n_cols:
+        raise ValueError("linear_assignment needs at least as many columns as rows")
+    # potentials and matching are 1-based; column 0 is a virtual start column
+    u = np.zeros(n_rows + 1)
+    v = np.zeros(n_cols + 1)
+    row_of = np.zeros(n_cols + 1, dtype=np.int64)
+    way = np.zeros(n_cols + 1, dtype=np.int64)
+
+    for row in range(1, n_rows + 1):
+        row_of[0] = row
+        col = 0
+        min_reduced = np.full(n_cols + 1, np.inf)
+        used = np.zeros(n_cols + 1, dtype=bool)
+        while row_of[col] != 0:
+            used[col] = True
+            reduced = cost[row_of[col] - 1] - u[row_of[col]] - v[1:]
+            free = ~used[1:]
+            better = free & (reduced < min_reduced[1:])
+            min_reduced[1:][better] = reduced[better]
+            way[1:][better] = col
+            candidates = np.where(free, min_reduced[1:], np.inf)
+            next_col = int(np.argmin(candidates)) + 1
+            delta = candidates[next_col - 1]
+            u[row_of[used]] += delta
+            v[used] -= delta
+            min_reduced[1:][free] -= delta
+            col = next_col
+        # flipping the augmenting path
+        while col:
+            previous = way[col]
+            row_of[col] = row_of[previous]
+            col = previous
+
+    assignment = np.empty(n_rows, dtype=np.int64)
+    matched = np.flatnonzero(row_of[1:])
+    assignment[row_of[1:][matched] - 1] = matched
+    return assignment
+
+
+def best_assignment(ratings):
+    """
+    Exact replacement for initialize_pop + finding_best_schedule: the
+    ordering of the programs over the first time slots with the highest
+    total rating
+    Input:
+    Ratings, dict of program -> list of ratings per time slot
+    Output:
+    Schedule, one program per time slot for min(programs, time slots) slots
+    """
+    programs = list(ratings)
+    matrix = ratings_matrix(ratings)
+    n_slots = min(matrix.shape)
+    # slots x programs, negated so the minimum cost is the maximum rating
+    cost = -matrix[:, :n_slots].T
+    return [programs[i] for i in linear_assignment(cost)]
+
+
+def ratings_matrix(ratings):
+    """
+    Ratings as a (programs, time slots) array; row i belongs to the i-th
+    program of the dict
+    """
+    if isinstance(ratings, Ratings):
+        return ratings.matrix
+    return np.array([ratings[program] for program in ratings], dtype=np.float64)
+
+
+def schedule_fitness(schedules, matrix):
+    """
+    Total rating of every schedule with one gather
+    Input:
+    1- Integer array of program indices, one schedule per row
+    2- Ratings matrix (see ratings_matrix)
+    Output:
+    Array of total ratings
+    """
+    return matrix[schedules, np.arange(schedules.shape[1])].sum(axis=1)
+
+
+# Crossover
+def crossover_batch(parents1, parents2, crossover_rate, rng):
+    """
+    One-point crossover of parent pairs, each pair with probability
+    crossover_rate; the others are copied
+    Output:
+    (children, mask of the pairs that were crossed)
+    """
+    n_pairs, n_slots = parents1.shape
+    crossed = rng.random(n_pairs) < crossover_rate
+    if n_slots < 3:
+        crossed[:] = False
+    points = rng.integers(1, max(n_slots - 1, 2), n_pairs)
+    head = (np.arange(n_slots) < points[:, None]) | ~crossed[:, None]
+    children = np.concatenate([np.where(head, parents1, parents2), np.where(head, parents2, parents1)])
+    return children, np.concatenate([crossed, crossed])
+
+
+# mutating
+def mutate_batch(children, mutation_rate, n_programs, rng):
+    """
+    Replacing one random slot of each child with a random program with
+    probability mutation_rate, in place
+    Output:
+    Mask of the mutated children
+    """
+    mutated = rng.random(len(children)) < mutation_rate
+    rows = np.flatnonzero(mutated)
+    children[rows, rng.integers(0, children.shape[1], len(rows))] = rng.integers(0, n_programs, len(rows))
+    return mutated
+
+
+def next_generation(population, fitness, matrix, crossover_rate, mutation_rate, n_elite, rng):
+    """
+    One generation of the schedule GA: the n_elite best schedules survive and
+    the rest are replaced by crossed and mutated children of random parents
+    Input:
+    1- Integer array of program indices, one schedule per row
+    2- Total rating of every schedule
+    3- Ratings matrix (see ratings_matrix)
+    4- Crossover and mutation rates, number of elites
+    5- numpy random Generator
+    Output:
+    (new population, its ratings)
+    """
+    population_size = len(population)
+    n_pairs = (population_size - n_elite + 1) // 2
+    elites = np.argsort(-fitness, kind="stable")[:n_elite]
+
+    parents = rng.integers(0, population_size, (2, n_pairs))
+    children, changed = crossover_batch(population[parents[0]], population[parents[1]], crossover_rate, rng)
+    changed |= mutate_batch(children, mutation_rate, len(matrix), rng)
+    # unchanged children are copies, so they inherit their parent's fitness
+    children_fitness = fitness[np.concatenate([parents[0], parents[1]])]
+    children_fitness[changed] = schedule_fitness(children[changed], matrix)
+
+    n_children = population_size - n_elite
+    return (np.concatenate([population[elites], children[:n_children]]),
+            np.concatenate([fitness[elites], children_fitness[:n_children]]))
+
+
+def evolve_schedules(schedules, n_generations, rng, matrix, crossover_rate=0.8, mutation_rate=0.2, elitism=2):
+    """
+    Evolving a population of schedules in place, for the island model (see
+    island_schedule)
+    Input:
+    1- Integer array of program indices, one schedule per row (modified in place)
+    2- Number of generations
+    3- numpy random Generator
+    4- Ratings matrix (see ratings_matrix)
+    5- Crossover and mutation rates, number of elites (optional)
+    Output:
+    Total rating of every schedule
+    """
+    population, fitness = schedules, schedule_fitness(schedules, matrix)
+    n_elite = min(elitism, len(schedules))
+    for _ in range(n_generations):
+        population, fitness = next_generation(population, fitness, matrix, crossover_rate, mutation_rate, n_elite,
+                                              rng)
+    schedules[...] = population
+    return fitness
+
+
+def schedule_cost(schedules, matrix):
+    """
+    Negated total rating of every schedule, the island model's lower-is-better cost
+    """
+    return -schedule_fitness(schedules, matrix)
+
+
+# Genetic Algorithm
+def genetic_algorithm(initial_schedule, ratings, crossover_rate, mutation_rate, rng, population_size=50,
+                      generations=100, elitism=2, patience=None, target_rating=None, time_budget=None,
+                      on_generation=None):
+    """
+    Evolving schedules of program indices; fitness is kept next to every
+    individual and only recomputed for crossed or mutated children
+    Input:
+    1- Initial schedule (list of programs), at most one per time slot; the
+       rest of the first population are shuffles of it
+    2- Ratings, dict of program -> list of ratings per time slot
+    3- Crossover and mutation rates
+    4- random.Random
+    5- Population size, number of generations and number of elites (optional)
+    6- Early stopping: generations without improvement, rating to reach and
+       wall-clock seconds (optional)
+    7- on_generation(generation, best_rating), called after every generation
+       (optional)
+    Output:
+    Best schedule of the last population
+    """
+    if generations is None and patience is None and target_rating is None and time_budget is None:
+        raise ValueError("generations=None needs patience, target_rating or time_budget to stop")
+    if population_size < 1:
+        raise ValueError("population_size must be at least 1")
+    deadline = None if time_budget is None else time.monotonic() + time_budget
+    programs = list(ratings)
+    index = {program: i for i, program in enumerate(programs)}
+    matrix = ratings_matrix(ratings)
+    np_rng = np.random.default_rng(rng.getrandbits(64))
+
+    if len(initial_schedule) > matrix.shape[1]:
+        raise ValueError(f"Initial schedule has {len(initial_schedule)} programs "
+                         f"for {matrix.shape[1]} time slots")
+    initial = np.array([index[program] for program in initial_schedule], dtype=np.int64)
+    population = np.empty((population_size, len(initial)), dtype=np.int64)
+    population[0] = initial
+    population[1:] = initial[np.argsort(np_rng.random((population_size - 1, len(initial))), axis=1)]
+    fitness = schedule_fitness(population, matrix)
+
+    n_elite = min(elitism, population_size)
+    best = fitness.max()
+    stale = 0
+    generation = 0
+    while generations is None or generation < generations:
+        if target_rating is not None and best >= target_rating:
+            break
+        if patience is not None and stale >= patience:
+            break
+        if deadline is not None and time.monotonic() >= deadline:
+            break
+        generation += 1
+
+        population, fitness = next_generation(population, fitness, matrix, crossover_rate, mutation_rate, n_elite,
+                                              np_rng)
+
+        if fitness.max() > best:
+            best = fitness.max()
+            stale = 0
+        else:
+            stale += 1
+        if on_generation is not None:
+            on_generation(generation, float(best))
+
+    return [programs[i] for i in population[np.argmax(fitness)]]
+
+
+def schedule_programs(ratings, config=None, time_slots=ALL_TIME_SLOTS, on_generation=None):
+    """
+    Building the full-day schedule: the best ordering of all programs (see
+    TVConfig.method), padded to the number of time slots with the start of
+    the GA's schedule
+    Input:
+    1- Ratings, dict of program -> list of ratings per time slot
+    2- TVConfig (optional)
+    3- Time slots (optional)
+    4- on_generation(generation, best_rating), called after every generation
+       of each GA run (optional)
+    Output:
+    TVResult
+    """
+    config = config or TVConfig()
+    rng = random.Random(config.seed)
+    # one deadline for the request; each GA run gets the time that is left
+    deadline = None if config.time_budget is None else time.monotonic() + config.time_budget
+    options = dict(population_size=config.population_size, generations=config.generations,
+                   elitism=config.elitism, patience=config.patience, target_rating=config.target_rating,
+                   on_generation=on_generation)
+
+    def remaining():
+        return None if deadline is None else max(deadline - time.monotonic(), 0.0)
+
+    # initial best schedule
+    if config.method == "assignment":
+        initial_best_schedule = best_assignment(ratings)
+    elif config.method == "brute_force":
+        all_possible_schedules = initialize_pop(list(ratings.keys()), time_slots)
+        initial_best_schedule = finding_best_schedule(all_possible_schedules, ratings)
+    elif config.method == "ga":
+        # one program per slot; mutation brings in the programs left out
+        start = rng.sample(list(ratings), min(len(ratings), len(time_slots)))
+        initial_best_schedule = genetic_algorithm(start, ratings, config.crossover_rate,
+                                                  config.mutation_rate, rng, time_budget=remaining(), **options)
+    else:
+        raise ValueError(f"Unknown scheduling method: {config.method}")
+    rem_t_slots = len(time_slots) - len(initial_best_schedule)
+
+    genetic_schedule = genetic_algorithm(initial_best_schedule, ratings, config.crossover_rate,
+                                         config.mutation_rate, rng, time_budget=remaining(), **options)
+
+    final_schedule = initial_best_schedule + genetic_schedule[:rem_t_slots]
+    return TVResult(final_schedule, fitness_function(final_schedule, ratings))
+
+
+def island_schedule(ratings, n_islands=4, population_size=50, n_epochs=20, migration_interval=10, n_migrants=2,
+                    topology="ring", processes=None, seed=None, **options):
+    """
+    Searching full-day schedules with the island model: n_islands
+    populations of random schedules, one program per time slot with repeats
+    allowed, are evolved with evolve_schedules in a process pool
+    Input:
+    1- Ratings, dict of program -> list of ratings per time slot
+    2- Island model settings (see ga.islands.run_islands)
+    3- Extra evolve_schedules options (crossover_rate, mutation_rate, elitism)
+    Output:
+    run_islands result; "best" is the best schedule as program indices,
+    "schedule" the same schedule as a list of programs and "best_cost" minus
+    its total rating
+    """
+    matrix = ratings_matrix(ratings)
+    programs = list(ratings)
+    rng = np.random.default_rng(seed)
+    populations = rng.integers(0, len(programs), (n_islands, population_size, matrix.shape[1]))
+    result = run_islands(evolve_schedules, schedule_cost, populations, n_epochs, migration_interval, n_migrants,
+                         topology, processes, seed, problem={"matrix": matrix}, options=options)
+    result["schedule"] = [programs[i] for i in result["best"]]
+    return result
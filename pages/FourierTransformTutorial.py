@@ -1,11 +1,12 @@
 from typing import final
 import streamlit as st
-import cv2
-# To make things easier later, we're also importing numpy and pandas for
-# working with sample data.
-import numpy as np
 from PIL import Image
 from streamlit_drawable_canvas import st_canvas
+from fourier.engine import masked_inverse
+from fourier.filters import KINDS, PROFILES, FilterSpec, combine_gain, filter_gain, filtered_inverse
+from fourier.masks import mask_bool, mask_from_canvas
+from fourier.pyramid import fit_for_display, png_bytes, upscale_mask
+from fourier.spectrum import default_spectrum_cache
 
 
 
@@ -18,24 +19,14 @@ drawing_mode = st.sidebar.selectbox(
 )
 realtime_update = st.sidebar.checkbox("Update in realtime", True)
 
-def get_masked_image(image, canvas_image):
-    mask = canvas_image[:,:,3]
-    mask_inv = cv2.bitwise_not(mask)
-    mask_inv3 = cv2.merge((mask_inv,mask_inv,mask_inv))
-    return cv2.bitwise_and(image, mask_inv3)
-
-
-def inverse_furiour(image):
-    final_image = []
-    for c in image:
-        channel = abs(np.fft.ifft2(c))
-#         plt.imshow(channel)
-#         plt.show()
-        final_image.append(channel)
-    final_image_assebled = np.dstack([final_image[0].astype('int'),
-                                     final_image[1].astype('int'),
-                                     final_image[2].astype('int')])
-    return final_image_assebled
+# analytic filter, applied together with the painted masks
+filter_kind = st.sidebar.selectbox("Filter:", ("none",) + KINDS)
+if filter_kind != "none":
+    filter_profile = st.sidebar.selectbox("Filter profile:", PROFILES)
+    filter_cutoff = st.sidebar.slider("Cut-off (cycles/pixel): ", 0.005, 0.5, 0.1, step=0.005)
+    filter_high = st.sidebar.slider("Upper cut-off (band filters): ", 0.005, 0.5, 0.25, step=0.005)
+    filter_order = st.sidebar.number_input("Butterworth order: ", min_value=1, max_value=10, value=2)
+    filter_centers = st.sidebar.text_input("Notch centres (v,h; v,h): ", "0,0.25")
 
 def create_canvas_draw_instance(background_image, key, height, width): 
 
@@ -44,7 +35,7 @@ def create_canvas_draw_instance(background_image, key, height, width):
         stroke_width=stroke_width,
         stroke_color=stroke_color,
         background_color=bg_color,
-        background_image=Image.open(background_image),
+        background_image=Image.fromarray(background_image),
         update_streamlit=realtime_update,
         drawing_mode=drawing_mode,
         height = height, 
@@ -54,55 +45,6 @@ def create_canvas_draw_instance(background_image, key, height, width):
 
     return canvas_result
 
-def get_mask_from_canvas(canvas_images):
-    list_mask = []
-    for image in canvas_images:
-        list_mask.append(image[:,:,3])
-        
-    return list_mask
-
-def normalize_image(img):
-    img = img / np.max(img)
-    return (img*255).astype('uint8')
-
-def write_background_images(images, names): 
-    for image, name in zip(images, names):
-        image3 = cv2.merge((image,image,image))
-        image_3_nor = normalize_image(image3)
-        cv2.imwrite(name, image_3_nor)
-
-def write_canvas_images(images, names): 
-    for image, name in zip(images, names): 
-        cv2.imwrite(name, image) 
-
-def rgb_fft(image):
-    f_size = 25
-    fft_images=[]
-    fft_images_log = []
-    for i in range(3):
-        rgb_fft = np.fft.fftshift(np.fft.fft2((image[:, :, i])))
-        fft_images.append(rgb_fft)
-        fft_images_log.append(np.log(abs(rgb_fft)))
-    
-    return fft_images, fft_images_log
-
-
-def apply_mask(input_image, mask): 
-    _, mask_thresh = cv2.threshold(mask, 120, 255, cv2.THRESH_BINARY)
-    mask_bool = mask_thresh.astype('bool')
-    input_image[mask_bool] = 1
-    
-    return input_image 
-
-
-def apply_mask_all(list_images, list_mask): 
-    final_result = []
-    
-    for (i,mask) in zip(list_images, list_mask):
-        result = apply_mask(i,mask)
-        final_result.append(result)
-    return final_result
-
 def main():
 
     st.header("Fourier Transformation - ")
@@ -111,25 +53,23 @@ def main():
 
     if uploaded_file is not None: 
         
-        original = Image.open(uploaded_file)
-        img = np.array(original)
-        st.image(img, use_column_width=True)
-    
-        fft_images, fft_images_log = rgb_fft(img)
+        # decoding and the forward transforms only run for a new image
+        spectrum = default_spectrum_cache().get(uploaded_file.getvalue())
+        img = spectrum.image
+        # only display-sized copies are sent to the browser
+        st.image(spectrum.thumbnail, use_column_width=True)
 
-        for temp in fft_images_log:
-            st.text(temp.shape)
+        height, width = spectrum.preview_shape
+        st.text(f"Spectrum {img.shape[0]}x{img.shape[1]}, editing on a {height}x{width} preview")
 
-        names = ["bg_image_r.png", "bg_image_g.png", "bg_image_b.png"]
-
-        write_background_images(fft_images_log, names)
+        previews = spectrum.previews
 
         st.text("Red Channel in frequency domain - ")
-        canvas_r = create_canvas_draw_instance(names[0], key="red", height=img.shape[0], width=img.shape[1])
+        canvas_r = create_canvas_draw_instance(previews[0], key="red", height=height, width=width)
         st.text("Green Channel in frequency domain - ")
-        canvas_g = create_canvas_draw_instance(names[1], key="green",height=img.shape[0], width=img.shape[1])
+        canvas_g = create_canvas_draw_instance(previews[1], key="green", height=height, width=width)
         st.text("Blue channel in frequency domain - ")
-        canvas_b = create_canvas_draw_instance(names[2], key="blue", height=img.shape[0], width=img.shape[1])
+        canvas_b = create_canvas_draw_instance(previews[2], key="blue", height=height, width=width)
         
         # st.text(type(canvas_r.image_data))
         # st.text(img.shape)
@@ -140,32 +80,32 @@ def main():
         if st.button('Get Result: - '):
             
             canvas_image_data = [canvas_r.image_data, canvas_g.image_data, canvas_b.image_data]
-            
-            names_canvas_images = ["canvas_image_r.png","canvas_image_g.png","canvas_image_b.png"]
-            write_canvas_images(canvas_image_data, names_canvas_images)
-
-            # appending the images which are saved earlier
-            canvas_images = []
-
-            for name in names_canvas_images: 
-                canvas_images.append(cv2.imread(name,-1))
-
-            list_mask = get_mask_from_canvas(canvas_images)
-
-            # reading canvas images 
-            result = apply_mask_all(fft_images, list_mask)
-
-            transformed = inverse_furiour(result)
-
-            # result_clipped = np.clip(result, 0 ,255)
-
-            # result_formatted = np.dstack([result_clipped[0],
-            #                             result_clipped[1],
-            #                             result_clipped[2]])
 
-            transformed_clipped = np.clip(transformed, 0, 255)
+            # the masks are the canvases' alpha channels, drawn on the preview
+            # and scaled up to the full resolution spectrum; painted
+            # frequencies are removed, with or without a filter
+            list_mask = [upscale_mask(mask_bool(mask_from_canvas(data, (height, width))), img.shape[:2])
+                         for data in canvas_image_data]
+
+            workers = default_spectrum_cache().workers
+            if filter_kind == "none":
+                # one batched inverse real FFT, straight to a clipped uint8 image
+                transformed_clipped = masked_inverse(spectrum.half, list_mask, spectrum.width, workers=workers)
+            else:
+                try:
+                    centers = tuple(tuple(float(value) for value in center.split(","))
+                                    for center in filter_centers.split(";") if center.strip())
+                    spec = FilterSpec(filter_kind, filter_profile, filter_cutoff, filter_high, filter_order, centers)
+                except ValueError as error:
+                    st.error(f"Invalid filter: {error}")
+                    st.stop()
+                # painted frequencies are removed on top of the filter
+                gain = combine_gain(filter_gain(spec, img.shape[:2]), list_mask)
+                transformed_clipped = filtered_inverse(spectrum.half, gain, spectrum.width, workers=workers)
             st.text("Image Returned by Inverse Fourier Transform - ")
-            st.image(transformed_clipped, use_column_width=True)
+            st.image(fit_for_display(transformed_clipped), use_column_width=True)
+            st.download_button("Download full resolution", png_bytes(transformed_clipped),
+                               file_name="inverse_fourier.png", mime="image/png")
 
 
 
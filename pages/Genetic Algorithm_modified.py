@@ -1,6 +1,8 @@
 import streamlit as st
-import random
 import time
+from ga.cache import default_cache, stable_key
+from ga.jobs import default_runner, run_string_job
+from ga.strings import StringGAConfig, validate
 
 st.set_page_config(
     page_title="Genetic Algorithm"
@@ -22,118 +24,69 @@ POP_SIZE = 500
 #GENES: Options from which our population would be created.
 GENES = ' abcdefghijklmnopqrstuvwxyz'
 
-#initialization
-
-def initialize_pop(TARGET):
-  population = list()
-  tar_len = len(TARGET)
-
-  for i in range(POP_SIZE):
-      temp = list()
-      for j in range(tar_len):
-          temp.append(random.choice(GENES))
-      population.append(temp)
-
-  return population
-
-#fitness calculation
-#0 fitness means target found
-
-def fitness_cal(TARGET, chromo_from_pop):
-  difference = 0
-  for tar_char, chromo_char in zip(TARGET, chromo_from_pop):
-      if tar_char != chromo_char:
-          difference+=1
-  return [chromo_from_pop, difference]
-
-#selection
-#returns top 50% population sorted according to fitness
-
-def selection(population, TARGET):
-  sorted_chromo_pop = sorted(population, key= lambda x: x[1])
-  return sorted_chromo_pop[:int(0.5*POP_SIZE)]
-
-#crossover
-
-def crossover(selected_chromo, CHROMO_LEN, population):
-  offspring_cross = []
-  for i in range(int(POP_SIZE)):
-    parent1 = random.choice(selected_chromo)
-    parent2 = random.choice(population[:int(POP_SIZE*50)])
-
-    p1 = parent1[0]
-    p2 = parent2[0]
-
-    crossover_point = random.randint(1, CHROMO_LEN-1)
-    child =  p1[:crossover_point] + p2[crossover_point:]
-    offspring_cross.extend([child])
-  return offspring_cross
-
-#mutation
-
-def mutate(offspring, MUT_RATE):
-  mutated_offspring = []
-
-  for arr in offspring:
-      for i in range(len(arr)):
-          if random.random() < MUT_RATE:
-              arr[i] = random.choice(GENES)
-      mutated_offspring.append(arr)
-  return mutated_offspring
-
-#replacement
-
-def replace(new_gen, population):
-  for _ in range(len(population)):
-      if population[_][1] > new_gen[_][1]:
-        population[_][0] = new_gen[_][0]
-        population[_][1] = new_gen[_][1]
-  return population
+#UPDATE_MS: Minimum time between UI refreshes, in milliseconds.
+UPDATE_MS = 200
 
 #main
 
 def main(POP_SIZE, MUT_RATE, TARGET, GENES):
-    # 1) initialize population
-    initial_population = initialize_pop(TARGET)
-    found = False
-    population = []
-    generation = 1
-
-    # 2) Calculating the fitness for the current population
-    for _ in range(len(initial_population)):
-        population.append(fitness_cal(TARGET, initial_population[_]))
-
-    # now population has 2 things, [chromosome, fitness]
-    # 3) now we loop until TARGET is found
-    while not found:
-
-      # 3.1) select best people from current population
-      selected = selection(population, TARGET)
-
-      # 3.2) mate parents to make new generation
-      population = sorted(population, key= lambda x:x[1])
-      crossovered = crossover(selected, len(TARGET), population)
-
-      # 3.3) mutating the children to diversify the new generation
-      mutated = mutate(crossovered, MUT_RATE)
-
-      new_gen = []
-      for _ in mutated:
-          new_gen.append(fitness_cal(TARGET, _))
-
-      # 3.4) replacement of bad population with new generation
-      # we sort here first to compare the least fit population with the most fit new_gen
-
-      population = replace(new_gen, population)
-
-
-      if (population[0][1] == 0):
+    config = StringGAConfig(TARGET, POP_SIZE, MUT_RATE, GENES)
+    try:
+        validate(config)
+    except ValueError as error:
+        st.error(str(error))
+        return
+
+    if 'name_job' in st.session_state:
+        default_runner().forget(st.session_state.pop('name_job'))
+    st.session_state.name_key = stable_key(run_string_job, config)
+    # earlier runs of the same config are shown straight from the cache
+    if default_cache().get(st.session_state.name_key) is None:
+        st.session_state.name_job = default_runner().submit(run_string_job, config, UPDATE_MS / 1000)
+
+def show_progress(generation, best_string, fitness, history):
+    st.write('String: ' + str(list(best_string)) + ' Generation: ' + str(generation) + ' Fitness: ' + str(fitness))
+    st.line_chart({'best': history.best, 'mean': history.mean})
+
+def show_result(result, history):
+    show_progress(result.generations, result.best, result.fitness, history)
+    if result.found:
         st.write('Target found')
-        st.write('String: ' + str(population[0][0]) + ' Generation: ' + str(generation) + ' Fitness: ' + str(population[0][1]))
-        break
-      st.write('String: ' + str(population[0][0]) + ' Generation: ' + str(generation) + ' Fitness: ' + str(population[0][1]))
-      generation+=1
-        
+    st.download_button('Download fitness history', history.to_csv(), 'fitness_history.csv', 'text/csv')
+
+def show_job(job_id):
+    try:
+        status = default_runner().status(job_id)
+    except KeyError:
+        # pruned by the runner after too many newer runs finished
+        del st.session_state.name_job
+        return
+
+    if status in ('pending', 'running'):
+        progress = default_runner().progress(job_id)
+        if progress is None:
+            st.write('Waiting for a worker...')
+        else:
+            stats, history = progress
+            show_progress(stats.generation, stats.best, stats.fitness, history)
+        if st.button('Cancel'):
+            default_runner().cancel(job_id)
+        time.sleep(UPDATE_MS / 1000)
+        st.rerun()
+    elif status == 'done':
+        result, history = default_runner().result(job_id)
+        # from now on the result is served by the cache
+        default_cache().put(st.session_state.name_key, (result, history))
+        default_runner().forget(st.session_state.pop('name_job'))
+        show_result(result, history)
+    elif status == 'cancelled':
+        st.write('Run cancelled')
+    else:
+        try:
+            default_runner().result(job_id)
+        except Exception as error:
+            st.error('Run failed: ' + str(error))
+
 with st.form("my_form"):
     TARGET = st.text_input("Enter your name")
     MUT_RATE = st.number_input("Enter your mutation rate")
@@ -143,5 +96,10 @@ with st.form("my_form"):
     if calculate:
         main(POP_SIZE, MUT_RATE, TARGET, GENES)
 
-
-
+# the job is shown outside the form, which cannot hold buttons
+if 'name_job' in st.session_state:
+    show_job(st.session_state.name_job)
+elif 'name_key' in st.session_state:
+    cached = default_cache().get(st.session_state.name_key)
+    if cached is not None:
+        show_result(*cached)
@@ -1,9 +1,10 @@
 import matplotlib.pyplot as plt
-import numpy as np
-import random
 import seaborn as sns
+import time
 import streamlit as st
-from itertools import permutations
+from ga.cache import default_cache, stable_key
+from ga.jobs import default_runner, run_solver_job
+from ga.tsp import TSPConfig, solve_tsp
 
 # User Input for Cities and Coordinates
 st.title("Genetic Algorithm for TSP with Custom City Coordinates")
@@ -25,6 +26,10 @@ n_population = st.slider("Population Size", min_value=100, max_value=1000, value
 crossover_per = st.slider("Crossover Percentage", min_value=0.0, max_value=1.0, value=0.8)
 mutation_per = st.slider("Mutation Percentage", min_value=0.0, max_value=1.0, value=0.2)
 n_generations = st.slider("Number of Generations", min_value=50, max_value=500, value=200)
+selection_method = st.selectbox("Selection Method", ["roulette", "tournament", "sus"])
+local_search = st.checkbox("Refine the best route with 2-opt / Or-opt local search")
+# results are cached per seed; pick another one for a different run
+seed = st.number_input("Random seed", min_value=0, value=0)
 
 # Pastel Palette
 colors = sns.color_palette("pastel", len(cities_names))
@@ -53,69 +58,65 @@ for i, (city, (city_x, city_y)) in enumerate(city_coords.items()):
 fig.set_size_inches(16, 12)
 st.pyplot(fig)
 
-# Genetic Algorithm
-def initial_population(cities_list, n_population=250):
-    population_perms = []
-    possible_perms = list(permutations(cities_list))
-    random_ids = random.sample(range(0, len(possible_perms)), n_population)
-    for i in random_ids:
-        population_perms.append(list(possible_perms[i]))
-    return population_perms
-
-def dist_two_cities(city_1, city_2):
-    city_1_coords = city_coords[city_1]
-    city_2_coords = city_coords[city_2]
-    return np.sqrt(np.sum((np.array(city_1_coords) - np.array(city_2_coords))**2))
-
-def total_dist_individual(individual):
-    total_dist = 0
-    for i in range(len(individual)):
-        total_dist += dist_two_cities(individual[i], individual[(i + 1) % len(individual)])
-    return total_dist
-
-def fitness_prob(population):
-    total_dist_all_individuals = [total_dist_individual(indiv) for indiv in population]
-    max_population_cost = max(total_dist_all_individuals)
-    population_fitness = max_population_cost - np.array(total_dist_all_individuals)
-    population_fitness_sum = np.sum(population_fitness)
-    return population_fitness / population_fitness_sum
-
-def roulette_wheel(population, fitness_probs):
-    cumsum_probs = np.cumsum(fitness_probs)
-    selected_index = np.where(cumsum_probs > np.random.uniform(0, 1))[0][0]
-    return population[selected_index]
-
-def crossover(parent_1, parent_2):
-    cut = random.randint(1, len(cities_names) - 2)
-    offspring_1 = parent_1[:cut] + [city for city in parent_2 if city not in parent_1[:cut]]
-    offspring_2 = parent_2[:cut] + [city for city in parent_1 if city not in parent_2[:cut]]
-    return offspring_1, offspring_2
-
-def mutation(offspring):
-    index_1, index_2 = random.sample(range(len(cities_names)), 2)
-    offspring[index_1], offspring[index_2] = offspring[index_2], offspring[index_1]
-    return offspring
-
-def run_ga(cities_names, n_population, n_generations, crossover_per, mutation_per):
-    population = initial_population(cities_names, n_population)
-    for _ in range(n_generations):
-        fitness_probs = fitness_prob(population)
-        new_population = []
-        for _ in range(int(n_population * crossover_per // 2)):
-            parent_1 = roulette_wheel(population, fitness_probs)
-            parent_2 = roulette_wheel(population, fitness_probs)
-            offspring_1, offspring_2 = crossover(parent_1, parent_2)
-            if random.random() < mutation_per:
-                offspring_1 = mutation(offspring_1)
-            if random.random() < mutation_per:
-                offspring_2 = mutation(offspring_2)
-            new_population.extend([offspring_1, offspring_2])
-        population = sorted(new_population, key=total_dist_individual)[:n_population]
-    return population[0]
+# minimum time between progress refreshes, in milliseconds
+UPDATE_MS = 200
+
+def run_job(solver, *args):
+    # the solver runs on the shared job runner, so widget reruns do not
+    # restart it; the page polls it until the result can go in the cache
+    key = stable_key(solver, args, {})
+    cached = default_cache().get(key)
+    if cached is not None:
+        return cached
+    job = st.session_state.get("tutorial1_job")
+    if job is None or job[0] != key:
+        # the inputs changed, so an earlier run is no longer wanted
+        if job is not None:
+            default_runner().forget(job[1])
+        job_id = default_runner().submit(run_solver_job, solver, *args, interval=UPDATE_MS / 1000)
+        job = st.session_state["tutorial1_job"] = (key, job_id)
+    job_id = job[1]
+    try:
+        status = default_runner().status(job_id)
+    except KeyError:
+        # pruned by the runner after too many newer runs finished
+        del st.session_state["tutorial1_job"]
+        st.rerun()
+
+    if status in ("pending", "running"):
+        progress = default_runner().progress(job_id)
+        if progress is None:
+            st.write("Waiting for a worker...")
+        else:
+            st.write(f"Generation {progress[0]}: shortest distance {progress[1]:.3f}")
+        if st.button("Cancel"):
+            default_runner().cancel(job_id)
+        time.sleep(UPDATE_MS / 1000)
+        st.rerun()
+    elif status == "done":
+        result = default_runner().result(job_id)
+        # from now on the result is served by the cache
+        default_cache().put(key, result)
+        default_runner().forget(st.session_state.pop("tutorial1_job")[1])
+        return result
+    elif status == "cancelled":
+        st.write("Run cancelled")
+        if st.button("Run again"):
+            default_runner().forget(st.session_state.pop("tutorial1_job")[1])
+            st.rerun()
+    else:
+        try:
+            default_runner().result(job_id)
+        except Exception as error:
+            st.error(f"Run failed: {error}")
+    st.stop()
 
 # Run the Genetic Algorithm
-best_path = run_ga(cities_names, n_population, n_generations, crossover_per, mutation_per)
-min_distance = total_dist_individual(best_path)
+config = TSPConfig(n_population, n_generations, crossover_per, mutation_per, selection=selection_method,
+                   local_search=local_search, seed=seed)
+result = run_job(solve_tsp, [city_coords[city] for city in cities_names], config)
+min_distance = result.length
+best_path = [cities_names[i] for i in result.tour]
 
 st.write(f"Shortest Path Distance: {min_distance}")
 st.write(f"Best Path: {best_path}")
@@ -1,114 +1,23 @@
-import csv
-import random
+import os
+import time
 import streamlit as st
-from prettytable import PrettyTable
+from ga.cache import default_cache, stable_key
+from ga.jobs import default_runner, run_solver_job
+from ga.ratings import load_ratings
+from ga.tv import ALL_TIME_SLOTS, TVConfig, schedule_programs
 
-# Function to read the CSV file and convert it to the desired format
-def read_csv_to_dict(file_path):
-    program_ratings = {}
-    with open(file_path, mode='r', newline='') as file:
-        reader = csv.reader(file)
-        # Skip the header
-        header = next(reader)
-        for row in reader:
-            program = row[0]
-            ratings = [float(x) for x in row[1:]]  # Convert the ratings to floats
-            program_ratings[program] = ratings
-    return program_ratings
+# Path to the CSV file, next to this page
+file_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'program_ratings.csv')
 
-# Path to the CSV file
-file_path = 'pages/program_ratings.csv'
-
-# Get the data in the required format
-program_ratings_dict = read_csv_to_dict(file_path)
+# Get the data in the required format; the hour columns must match the time slots
+program_ratings_dict = load_ratings(file_path, ALL_TIME_SLOTS)
 
 ##################################### DEFINING PARAMETERS AND DATASET ################################################################
 # Sample rating programs dataset for each time slot.
 ratings = program_ratings_dict
 
 all_programs = list(ratings.keys())  # all programs
-all_time_slots = list(range(6, 24))  # time slots
-
-######################################### DEFINING FUNCTIONS ########################################################################
-# defining fitness function
-def fitness_function(schedule):
-    total_rating = 0
-    for time_slot, program in enumerate(schedule):
-        total_rating += ratings[program][time_slot]
-    return total_rating
-
-# initializing the population
-def initialize_pop(programs, time_slots):
-    if not programs:
-        return [[]]
-
-    all_schedules = []
-    for i in range(len(programs)):
-        for schedule in initialize_pop(programs[:i] + programs[i + 1:], time_slots):
-            all_schedules.append([programs[i]] + schedule)
-
-    return all_schedules
-
-# selection
-def finding_best_schedule(all_schedules):
-    best_schedule = []
-    max_ratings = 0
-
-    for schedule in all_schedules:
-        total_ratings = fitness_function(schedule)
-        if total_ratings > max_ratings:
-            max_ratings = total_ratings
-            best_schedule = schedule
-
-    return best_schedule
-
-# Crossover
-def crossover(schedule1, schedule2):
-    crossover_point = random.randint(1, len(schedule1) - 2)
-    child1 = schedule1[:crossover_point] + schedule2[crossover_point:]
-    child2 = schedule2[:crossover_point] + schedule1[crossover_point:]
-    return child1, child2
-
-# mutating
-def mutate(schedule):
-    mutation_point = random.randint(0, len(schedule) - 1)
-    new_program = random.choice(all_programs)
-    schedule[mutation_point] = new_program
-    return schedule
-
-# Genetic Algorithm
-def genetic_algorithm(initial_schedule, crossover_rate, mutation_rate):
-    population = [initial_schedule]
-
-    for _ in range(49):  # Fixed population size to 50
-        random_schedule = initial_schedule.copy()
-        random.shuffle(random_schedule)
-        population.append(random_schedule)
-
-    for _ in range(100):  # Fixed number of generations to 100
-        new_population = []
-
-        # Elitism
-        population.sort(key=lambda schedule: fitness_function(schedule), reverse=True)
-        new_population.extend(population[:2])  # Fixed elitism size to 2
-
-        while len(new_population) < 50:
-            parent1, parent2 = random.choices(population, k=2)
-            if random.random() < crossover_rate:
-                child1, child2 = crossover(parent1, parent2)
-            else:
-                child1, child2 = parent1.copy(), parent2.copy()
-
-            if random.random() < mutation_rate:
-                child1 = mutate(child1)
-            if random.random() < mutation_rate:
-                child2 = mutate(child2)
-
-            new_population.extend([child1, child2])
-
-        population = new_population
-
-    return population[0]
+all_time_slots = ALL_TIME_SLOTS  # time slots
 
 # Streamlit UI
 st.title("TV Program Scheduler with Genetic Algorithm")
@@ -116,21 +25,76 @@ st.title("TV Program Scheduler with Genetic Algorithm")
 # Input parameters
 crossover_rate = st.sidebar.number_input("Crossover Rate (CO_R)", min_value=0.0, max_value=1.0, value=0.8, step=0.01)
 mutation_rate = st.sidebar.number_input("Mutation Rate (MUT_R)", min_value=0.0, max_value=1.0, value=0.2, step=0.01)
-
-# Brute force (initial best schedule)
-all_possible_schedules = initialize_pop(all_programs, all_time_slots)
-initial_best_schedule = finding_best_schedule(all_possible_schedules)
-rem_t_slots = len(all_time_slots) - len(initial_best_schedule)
-
-# Genetic Algorithm
+method = st.sidebar.selectbox("Ordering Method", ["assignment", "ga", "brute_force"],
+                              help="assignment is exact and fast; brute_force tries all 10! orderings")
+population_size = st.sidebar.number_input("Population Size", min_value=2, max_value=100000, value=50)
+generations = st.sidebar.number_input("Generations", min_value=1, max_value=100000, value=100)
+elitism = st.sidebar.number_input("Elitism", min_value=0, max_value=100, value=2)
+patience = st.sidebar.number_input("Stop after generations without improvement (0 = never)", min_value=0, value=0)
+time_budget = st.sidebar.number_input("Time budget in seconds (0 = none)", min_value=0.0, value=0.0)
+# results are cached per seed; pick another one for a different run
+seed = st.sidebar.number_input("Random seed", min_value=0, value=0)
+
+# minimum time between progress refreshes, in milliseconds
+UPDATE_MS = 200
+
+def run_job(solver, *args):
+    # the solver runs on the shared job runner, so widget reruns do not
+    # restart it; the page polls it until the result can go in the cache
+    key = stable_key(solver, args, {})
+    cached = default_cache().get(key)
+    if cached is not None:
+        return cached
+    job = st.session_state.get("tv_schedule_job")
+    if job is None or job[0] != key:
+        # the inputs changed, so an earlier run is no longer wanted
+        if job is not None:
+            default_runner().forget(job[1])
+        job_id = default_runner().submit(run_solver_job, solver, *args, interval=UPDATE_MS / 1000)
+        job = st.session_state["tv_schedule_job"] = (key, job_id)
+    job_id = job[1]
+    try:
+        status = default_runner().status(job_id)
+    except KeyError:
+        # pruned by the runner after too many newer runs finished
+        del st.session_state["tv_schedule_job"]
+        st.rerun()
+
+    if status in ("pending", "running"):
+        progress = default_runner().progress(job_id)
+        if progress is None:
+            st.write("Waiting for a worker...")
+        else:
+            st.write(f"Generation {progress[0]}: best rating {progress[1]:.3f}")
+        if st.button("Cancel"):
+            default_runner().cancel(job_id)
+        time.sleep(UPDATE_MS / 1000)
+        st.rerun()
+    elif status == "done":
+        result = default_runner().result(job_id)
+        # from now on the result is served by the cache
+        default_cache().put(key, result)
+        default_runner().forget(st.session_state.pop("tv_schedule_job")[1])
+        return result
+    elif status == "cancelled":
+        st.write("Run cancelled")
+        if st.button("Run again"):
+            default_runner().forget(st.session_state.pop("tv_schedule_job")[1])
+            st.rerun()
+    else:
+        try:
+            default_runner().result(job_id)
+        except Exception as error:
+            st.error(f"Run failed: {error}")
+    st.stop()
+
+# Best ordering of all programs, then the Genetic Algorithm
 st.write("Running Genetic Algorithm...")
-genetic_schedule = genetic_algorithm(
-    initial_best_schedule,
-    crossover_rate=crossover_rate,
-    mutation_rate=mutation_rate
-)
+config = TVConfig(crossover_rate, mutation_rate, method, population_size, generations, elitism,
+                  patience=patience or None, time_budget=time_budget or None, seed=seed)
+result = run_job(schedule_programs, ratings, config, all_time_slots)
 
-final_schedule = initial_best_schedule + genetic_schedule[:rem_t_slots]
+final_schedule = result.schedule
 
 # Generate the schedule as a list of dictionaries for Streamlit table display
 def generate_schedule_table(schedule, time_slots):
@@ -147,5 +111,5 @@ st.write("### Final Optimal TV Schedule")
 schedule_table = generate_schedule_table(final_schedule, all_time_slots)
 st.table(schedule_table)
 
-st.write(f"### Total Ratings: {fitness_function(final_schedule)}")
-
+# ratings are stored as float32, so the sum is rounded for display
+st.write(f"### Total Ratings: {result.total_rating:.3f}")
@@ -0,0 +1,110 @@
+import os
+import pandas as pd
+import time
+import streamlit as st
+from ga.cache import default_cache, stable_key
+from ga.jobs import default_runner, run_solver_job
+from ga.multichannel import MultiScheduleConfig, ScheduleConstraints, broadcast_ratings, optimize_schedule
+from ga.ratings import load_ratings
+from ga.tv import ALL_TIME_SLOTS
+
+# Path to the CSV file, next to this page
+file_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'program_ratings.csv')
+ratings = load_ratings(file_path, ALL_TIME_SLOTS)
+DAYS = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+
+# Streamlit UI
+st.title("Multi-Channel Weekly TV Scheduler")
+
+n_channels = st.sidebar.number_input("Channels", min_value=1, max_value=len(ratings), value=3)
+n_days = st.sidebar.number_input("Days", min_value=1, max_value=len(DAYS), value=7)
+min_gap = st.sidebar.number_input("Minimum slots between repeats on a channel", min_value=1, max_value=48, value=3)
+no_simultaneous = st.sidebar.checkbox("No program on two channels at once", value=True)
+population_size = st.sidebar.number_input("Population Size", min_value=2, max_value=10000, value=100)
+generations = st.sidebar.number_input("Generations", min_value=1, max_value=10000, value=200)
+mutation_rate = st.sidebar.number_input("Mutation Rate per slot", min_value=0.0, max_value=1.0, value=0.01, step=0.01)
+
+st.write("Required slots (live events), one per line as `channel,day,hour,program`, e.g. `1,Sat,20,live_soccer`")
+required = st.text_area("Required slots", "", label_visibility="collapsed")
+
+fixed = {}
+for line_number, line in enumerate(required.splitlines(), 1):
+    if not line.strip():
+        continue
+    try:
+        channel, day, hour, program = [part.strip() for part in line.split(",")]
+        cell = (int(channel) - 1, DAYS.index(day), ALL_TIME_SLOTS.index(int(hour)))
+        if not 0 <= cell[0] < n_channels or cell[1] >= n_days:
+            raise ValueError("outside the schedule")
+        fixed[cell] = ratings.index[program]
+    except (ValueError, KeyError) as error:
+        st.error(f"Line {line_number} of the required slots is invalid: {error}")
+        st.stop()
+
+# minimum time between progress refreshes, in milliseconds
+UPDATE_MS = 200
+
+def run_job(solver, *args):
+    # the solver runs on the shared job runner, so widget reruns do not
+    # restart it; the page polls it until the result can go in the cache
+    key = stable_key(solver, args, {})
+    cached = default_cache().get(key)
+    if cached is not None:
+        return cached
+    job = st.session_state.get("multichannel_job")
+    if job is None or job[0] != key:
+        # the inputs changed, so an earlier run is no longer wanted
+        if job is not None:
+            default_runner().forget(job[1])
+        job_id = default_runner().submit(run_solver_job, solver, *args, interval=UPDATE_MS / 1000)
+        job = st.session_state["multichannel_job"] = (key, job_id)
+    job_id = job[1]
+    try:
+        status = default_runner().status(job_id)
+    except KeyError:
+        # pruned by the runner after too many newer runs finished
+        del st.session_state["multichannel_job"]
+        st.rerun()
+
+    if status in ("pending", "running"):
+        progress = default_runner().progress(job_id)
+        if progress is None:
+            st.write("Waiting for a worker...")
+        else:
+            st.write(f"Generation {progress[0]}: best fitness {progress[1]:.3f}")
+        if st.button("Cancel"):
+            default_runner().cancel(job_id)
+        time.sleep(UPDATE_MS / 1000)
+        st.rerun()
+    elif status == "done":
+        result = default_runner().result(job_id)
+        # from now on the result is served by the cache
+        default_cache().put(key, result)
+        default_runner().forget(st.session_state.pop("multichannel_job")[1])
+        return result
+    elif status == "cancelled":
+        st.write("Run cancelled")
+        if st.button("Run again"):
+            default_runner().forget(st.session_state.pop("multichannel_job")[1])
+            st.rerun()
+    else:
+        try:
+            default_runner().result(job_id)
+        except Exception as error:
+            st.error(f"Run failed: {error}")
+    st.stop()
+
+constraints = ScheduleConstraints(min_gap, fixed, no_simultaneous)
+config = MultiScheduleConfig(population_size, generations, mutation_rate=mutation_rate, seed=0)
+tensor = broadcast_ratings(ratings.matrix, n_channels, n_days)
+result = run_job(optimize_schedule, tensor, constraints, config)
+
+st.write(f"### Total Ratings: {result.total_rating:.3f}")
+if result.violations:
+    st.warning(f"{result.violations} slots still break a constraint; try a smaller minimum gap or fewer channels")
+
+for channel in range(n_channels):
+    st.write(f"#### Channel {channel + 1}")
+    table = pd.DataFrame([[ratings.programs[p] for p in result.schedule[channel, day]] for day in range(n_days)],
+                         index=DAYS[:n_days], columns=[f"{hour:02d}:00" for hour in ALL_TIME_SLOTS])
+    st.dataframe(table)
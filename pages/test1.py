@@ -1,12 +1,14 @@
 import matplotlib.pyplot as plt
-from itertools import permutations, combinations
+from itertools import combinations
 from random import shuffle
-import random
-import numpy as np
 import statistics
 import pandas as pd
 import seaborn as sns
+import time
 import streamlit as st
+from ga.cache import default_cache, stable_key
+from ga.jobs import default_runner, run_solver_job
+from ga.tsp import TSPConfig, solve_tsp
 
 x = [0,3,6,7,15,10,16,5,8,1.5]
 y = [1,2,1,4.5,-1,2.5,11,6,9,12]
@@ -16,6 +18,9 @@ n_population = 250
 crossover_per = 0.8
 mutation_per = 0.2
 n_generations = 200
+local_search = False
+# fixed, so the cached result is the same run every time
+seed = 0
 
 # Pastel Pallete
 colors = sns.color_palette("pastel", len(cities_names))
@@ -54,227 +59,70 @@ for i, (city, (city_x, city_y)) in enumerate(city_coords.items()):
 fig.set_size_inches(16, 12)
 
 st.pyplot(fig)
-#population
-def initial_population(cities_list, n_population = 250):
 
-    """
-    Generating initial population of cities randomly selected from the all possible permutations
-    of the given cities.
-    Input:
-    1- Cities list
-    2- Number of population
-    Output:
-    Generated lists of cities
-    """
-
-    population_perms = []
-    possible_perms = list(permutations(cities_list))
-    random_ids = random.sample(range(0,len(possible_perms)),n_population)
-
-    for i in random_ids:
-        population_perms.append(list(possible_perms[i]))
-
-    return population_perms
-
-#distance between two cities
-
-def dist_two_cities(city_1, city_2):
-
-    city_1_coords = city_coords[city_1]
-    city_2_coords = city_coords[city_2]
-    return np.sqrt(np.sum((np.array(city_1_coords) - np.array(city_2_coords))**2))
-
-
-def total_dist_individual(individual):
-
-    total_dist = 0
-    for i in range(0, len(individual)):
-        if(i == len(individual) - 1):
-            total_dist += dist_two_cities(individual[i], individual[0])
+# minimum time between progress refreshes, in milliseconds
+UPDATE_MS = 200
+
+def run_job(solver, *args):
+    # the solver runs on the shared job runner, so widget reruns do not
+    # restart it; the page polls it until the result can go in the cache
+    key = stable_key(solver, args, {})
+    cached = default_cache().get(key)
+    if cached is not None:
+        return cached
+    job = st.session_state.get("test1_job")
+    if job is None or job[0] != key:
+        # the inputs changed, so an earlier run is no longer wanted
+        if job is not None:
+            default_runner().forget(job[1])
+        job_id = default_runner().submit(run_solver_job, solver, *args, interval=UPDATE_MS / 1000)
+        job = st.session_state["test1_job"] = (key, job_id)
+    job_id = job[1]
+    try:
+        status = default_runner().status(job_id)
+    except KeyError:
+        # pruned by the runner after too many newer runs finished
+        del st.session_state["test1_job"]
+        st.rerun()
+
+    if status in ("pending", "running"):
+        progress = default_runner().progress(job_id)
+        if progress is None:
+            st.write("Waiting for a worker...")
         else:
-            total_dist += dist_two_cities(individual[i], individual[i+1])
-    return total_dist
-
-#fitness probablity function
-
-def fitness_prob(population):
-    """
-    Calculating the fitness probability
-    Input:
-    1- Population
-    Output:
-    Population fitness probability
-    """
-    total_dist_all_individuals = []
-    for i in range(0, len(population)):
-        total_dist_all_individuals.append(total_dist_individual(population[i]))
-
-    max_population_cost = max(total_dist_all_individuals)
-    population_fitness = max_population_cost - total_dist_all_individuals
-    population_fitness_sum = sum(population_fitness)
-    population_fitness_probs = population_fitness / population_fitness_sum
-    return population_fitness_probs
-
-#roulette wheel
-
-def roulette_wheel(population, fitness_probs):
-    """
-    Implement selection strategy based on roulette wheel proportionate selection.
-    Input:
-    1- population
-    2- fitness probabilities
-    Output:
-    selected individual
-    """
-    population_fitness_probs_cumsum = fitness_probs.cumsum()
-    bool_prob_array = population_fitness_probs_cumsum < np.random.uniform(0,1,1)
-    selected_individual_index = len(bool_prob_array[bool_prob_array == True]) - 1
-    return population[selected_individual_index]
-
-#crossover
-
-def crossover(parent_1, parent_2):
-    """
-    Implement mating strategy using simple crossover between 2 parents
-    Input:
-    1- parent 1
-    2- parent 2
-    Output:
-    1- offspring 1
-    2- offspring 2
-    """
-    n_cities_cut = len(cities_names) - 1
-    cut = round(random.uniform(1, n_cities_cut))
-    offspring_1 = []
-    offspring_2 = []
-
-    offspring_1 = parent_1[0:cut]
-    offspring_1 += [city for city in parent_2 if city not in offspring_1]
-
-
-    offspring_2 = parent_2[0:cut]
-    offspring_2 += [city for city in parent_1 if city not in offspring_2]
-
-
-    return offspring_1, offspring_2
-
-#mutation
-
-def mutation(offspring):
-    """
-    Implement mutation strategy in a single offspring
-    Input:
-    1- offspring individual
-    Output:
-    1- mutated offspring individual
-    """
-    n_cities_cut = len(cities_names) - 1
-    index_1 = round(random.uniform(0,n_cities_cut))
-    index_2 = round(random.uniform(0,n_cities_cut))
-
-    temp = offspring[index_1]
-    offspring[index_1] = offspring[index_2]
-    offspring[index_2] = temp
-    return(offspring)
-
-def run_ga(cities_names, n_population, n_generations, crossover_per, mutation_per):
-
-    population = initial_population(cities_names, n_population)
-    fitness_probs = fitness_prob(population)
-
-    parents_list = []
-    for i in range(0, int(crossover_per * n_population)):
-        parents_list.append(roulette_wheel(population, fitness_probs))
-
-    offspring_list = []
-    for i in range(0,len(parents_list), 2):
-        offspring_1, offspring_2 = crossover(parents_list[i], parents_list[i+1])
-
-    #     print(offspring_1)
-    #     print(offspring_2)
-    #     print()
-
-        mutate_threashold = random.random()
-        if(mutate_threashold > (1-mutation_per)):
-            offspring_1 = mutation(offspring_1)
-    #         print("Offspring 1 mutated", offspring_1)
-
-        mutate_threashold = random.random()
-        if(mutate_threashold > (1-mutation_per)):
-            offspring_2 = mutation(offspring_2)
-    #         print("Offspring 2 mutated", offspring_2)
-
-
-        offspring_list.append(offspring_1)
-        offspring_list.append(offspring_2)
-
-    mixed_offspring = parents_list + offspring_list
-
-    fitness_probs = fitness_prob(mixed_offspring)
-    sorted_fitness_indices = np.argsort(fitness_probs)[::-1]
-    best_fitness_indices = sorted_fitness_indices[0:n_population]
-    best_mixed_offspring = []
-    for i in best_fitness_indices:
-        best_mixed_offspring.append(mixed_offspring[i])
-
-
-
-    for i in range(0, n_generations):
-        # if (i%10 == 0):
-            # print("Generation: ", i)
-
-        fitness_probs = fitness_prob(best_mixed_offspring)
-        parents_list = []
-        for i in range(0, int(crossover_per * n_population)):
-            parents_list.append(roulette_wheel(best_mixed_offspring, fitness_probs))
-
-        offspring_list = []
-        for i in range(0,len(parents_list), 2):
-            offspring_1, offspring_2 = crossover(parents_list[i], parents_list[i+1])
-
-            mutate_threashold = random.random()
-            if(mutate_threashold > (1-mutation_per)):
-                offspring_1 = mutation(offspring_1)
-
-            mutate_threashold = random.random()
-            if(mutate_threashold > (1-mutation_per)):
-                offspring_2 = mutation(offspring_2)
-
-            offspring_list.append(offspring_1)
-            offspring_list.append(offspring_2)
-
-
-        mixed_offspring = parents_list + offspring_list
-        fitness_probs = fitness_prob(mixed_offspring)
-        sorted_fitness_indices = np.argsort(fitness_probs)[::-1]
-        best_fitness_indices = sorted_fitness_indices[0:int(0.8*n_population)]
-
-        best_mixed_offspring = []
-        for i in best_fitness_indices:
-            best_mixed_offspring.append(mixed_offspring[i])
-
-        old_population_indices = [random.randint(0, (n_population - 1)) for j in range(int(0.2*n_population))]
-        for i in old_population_indices:
-#             print(i)
-            best_mixed_offspring.append(population[i])
-
-        random.shuffle(best_mixed_offspring)
-
-    return best_mixed_offspring
-best_mixed_offspring = run_ga(cities_names, n_population, n_generations, crossover_per, mutation_per)
-
-total_dist_all_individuals = []
-for i in range(0, n_population):
-    total_dist_all_individuals.append(total_dist_individual(best_mixed_offspring[i]))
-
-index_minimum = np.argmin(total_dist_all_individuals)
-
-minimum_distance = min(total_dist_all_individuals)
+            st.write(f"Generation {progress[0]}: shortest distance {progress[1]:.3f}")
+        if st.button("Cancel"):
+            default_runner().cancel(job_id)
+        time.sleep(UPDATE_MS / 1000)
+        st.rerun()
+    elif status == "done":
+        result = default_runner().result(job_id)
+        # from now on the result is served by the cache
+        default_cache().put(key, result)
+        default_runner().forget(st.session_state.pop("test1_job")[1])
+        return result
+    elif status == "cancelled":
+        st.write("Run cancelled")
+        if st.button("Run again"):
+            default_runner().forget(st.session_state.pop("test1_job")[1])
+            st.rerun()
+    else:
+        try:
+            default_runner().result(job_id)
+        except Exception as error:
+            st.error(f"Run failed: {error}")
+    st.stop()
+
+# the GA keeps 20% of every generation for fresh random tours
+config = TSPConfig(n_population, n_generations, crossover_per, mutation_per, immigrant_per=0.2,
+                   local_search=local_search, seed=seed)
+result = run_job(solve_tsp, [city_coords[city] for city in cities_names], config)
+
+minimum_distance = result.length
 st.write(minimum_distance)
 
 #shortest path
-# shortest_path = offspring_list[index_minimum]
-shortest_path = best_mixed_offspring[index_minimum]
+shortest_path = [cities_names[i] for i in result.tour]
 st.write(shortest_path)
 
 x_shortest = []
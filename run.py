@@ -5,78 +5,85 @@ st.set_page_config(
 
 st.header("Genetic Algorithm", divider="gray")
 
-import random
+import time
+
+from ga.cache import default_cache, stable_key
+from ga.jobs import default_runner, run_string_job
+from ga.strings import GENES, StringGAConfig, validate
 
 # Default values
 POP_SIZE = 500
-GENES = ' abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ'
+# minimum time between UI refreshes, in milliseconds
+UPDATE_MS = 200
 
 # User inputs for target string and mutation rate
 TARGET = st.text_input("Enter your name", "Aqil")
 MUT_RATE = st.number_input("Enter your mutation rate", min_value=0.0, max_value=1.0, value=0.1, step=0.01)
 
-def initialize_pop(TARGET):
-    population = []
-    tar_len = len(TARGET)
-    for _ in range(POP_SIZE):
-        temp = [random.choice(GENES) for _ in range(tar_len)]
-        population.append(temp)
-    return population
-
-def fitness_cal(TARGET, chromo_from_pop):
-    difference = sum(1 for tar_char, chromo_char in zip(TARGET, chromo_from_pop) if tar_char != chromo_char)
-    return [chromo_from_pop, difference]
-
-def selection(population):
-    sorted_chromo_pop = sorted(population, key=lambda x: x[1])
-    return sorted_chromo_pop[:POP_SIZE // 2]
-
-def crossover(selected_chromo, CHROMO_LEN, population):
-    offspring_cross = []
-    for _ in range(POP_SIZE):
-        parent1 = random.choice(selected_chromo)
-        parent2 = random.choice(population[:POP_SIZE // 2])
-        crossover_point = random.randint(1, CHROMO_LEN - 1)
-        child = parent1[0][:crossover_point] + parent2[0][crossover_point:]
-        offspring_cross.append(child)
-    return offspring_cross
-
-def mutate(offspring, MUT_RATE):
-    for arr in offspring:
-        for i in range(len(arr)):
-            if random.random() < MUT_RATE:
-                arr[i] = random.choice(GENES)
-    return offspring
-
-def replace(new_gen, population):
-    for i in range(len(population)):
-        if population[i][1] > new_gen[i][1]:
-            population[i] = new_gen[i]
-    return population
-
 def main(POP_SIZE, MUT_RATE, TARGET, GENES):
-    initial_population = initialize_pop(TARGET)
-    found = False
-    population = [fitness_cal(TARGET, chromo) for chromo in initial_population]
-    generation = 1
-
-    while not found:
-        selected = selection(population)
-        crossovered = crossover(selected, len(TARGET), population)
-        mutated = mutate(crossovered, MUT_RATE)
-        new_gen = [fitness_cal(TARGET, chromo) for chromo in mutated]
-
-        population = replace(new_gen, population)
-        population = sorted(population, key=lambda x: x[1])
-
-        best_string = "".join(population[0][0])
-        st.write(f"String: {population[0][0]} Generation: {generation} Fitness: {population[0][1]}")
-
-        if population[0][1] == 0:
-            st.write("Target found")
-            break
-
-        generation += 1
+    config = StringGAConfig(TARGET, POP_SIZE, MUT_RATE, GENES)
+    try:
+        validate(config)
+    except ValueError as error:
+        st.error(str(error))
+        return
+
+    if "string_job" in st.session_state:
+        default_runner().forget(st.session_state.pop("string_job"))
+    st.session_state.string_key = stable_key(run_string_job, config)
+    # earlier runs of the same config are shown straight from the cache
+    if default_cache().get(st.session_state.string_key) is None:
+        st.session_state.string_job = default_runner().submit(run_string_job, config, UPDATE_MS / 1000)
+
+def show_progress(generation, best_string, fitness, history):
+    st.write(f"String: {list(best_string)} Generation: {generation} Fitness: {fitness}")
+    st.line_chart({"best": history.best, "mean": history.mean})
+
+def show_result(result, history):
+    show_progress(result.generations, result.best, result.fitness, history)
+    if result.found:
+        st.write("Target found")
+    st.download_button("Download fitness history", history.to_csv(), "fitness_history.csv", "text/csv")
+
+def show_job(job_id):
+    try:
+        status = default_runner().status(job_id)
+    except KeyError:
+        # pruned by the runner after too many newer runs finished
+        del st.session_state.string_job
+        return
+
+    if status in ("pending", "running"):
+        progress = default_runner().progress(job_id)
+        if progress is None:
+            st.write("Waiting for a worker...")
+        else:
+            stats, history = progress
+            show_progress(stats.generation, stats.best, stats.fitness, history)
+        if st.button("Cancel"):
+            default_runner().cancel(job_id)
+        time.sleep(UPDATE_MS / 1000)
+        st.rerun()
+    elif status == "done":
+        result, history = default_runner().result(job_id)
+        # from now on the result is served by the cache
+        default_cache().put(st.session_state.string_key, (result, history))
+        default_runner().forget(st.session_state.pop("string_job"))
+        show_result(result, history)
+    elif status == "cancelled":
+        st.write("Run cancelled")
+    else:
+        try:
+            default_runner().result(job_id)
+        except Exception as error:
+            st.error(f"Run failed: {error}")
 
 if st.button("Calculate"):
     main(POP_SIZE, MUT_RATE, TARGET, GENES)
+
+if "string_job" in st.session_state:
+    show_job(st.session_state.string_job)
+elif "string_key" in st.session_state:
+    cached = default_cache().get(st.session_state.string_key)
+    if cached is not None:
+        show_result(*cached)
@@ -0,0 +1,47 @@
+import functools
+import os
+
+import pytest
+
+from ga.cache import ResultCache, stable_key
+
+
+def make_scaler(factor):
+    return lambda value: value * factor
+
+
+def test_lambdas_and_closures_get_their_own_keys():
+    cache = ResultCache()
+    assert cache.call(lambda v: v * 2, 3) == 6
+    assert cache.call(lambda v: v * 10, 3) == 30
+    assert cache.call(make_scaler(2), 3) == 6
+    assert cache.call(make_scaler(5), 3) == 15
+    assert stable_key(make_scaler(2)) == stable_key(make_scaler(2))
+
+
+def test_disk_entries_are_salted(tmp_path):
+    ResultCache(directory=str(tmp_path), salt="old").put("key", 1)
+    assert ResultCache(directory=str(tmp_path), salt="old").get("key") == 1
+    assert ResultCache(directory=str(tmp_path), salt="new").get("key") is None
+
+
+def test_partials_are_keyed_by_their_arguments():
+    assert stable_key(functools.partial(pow, 2)) != stable_key(functools.partial(pow, 3))
+    assert stable_key(functools.partial(pow, 2)) == stable_key(functools.partial(pow, 2))
+
+
+def test_unhashable_callables_are_rejected():
+    class Scaler:
+        def __call__(self, value):
+            return value
+
+    with pytest.raises(TypeError):
+        stable_key(Scaler())
+
+
+def test_failed_disk_write_leaves_no_temp_file(tmp_path):
+    cache = ResultCache(directory=str(tmp_path))
+    with pytest.raises(Exception):
+        # lambdas cannot be pickled
+        cache.put("key", lambda: None)
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".tmp")]
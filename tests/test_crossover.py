@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+
+from ga.crossover import crossover_offspring, one_point_crossover, order_crossover
+from ga.population import random_tours
+
+
+def parent_pairs(n_pairs, n_cities, seed=0):
+    rng = np.random.default_rng(seed)
+    return random_tours(n_cities, n_pairs, rng, unique=False), random_tours(n_cities, n_pairs, rng, unique=False), rng
+
+
+def assert_permutations(children, n_cities):
+    np.testing.assert_array_equal(np.sort(children, axis=1), np.broadcast_to(np.arange(n_cities), children.shape))
+
+
+def one_point_reference(parent_1, parent_2, cut):
+    head = list(parent_1[:cut])
+    return head + [city for city in parent_2 if city not in head]
+
+
+def order_reference(parent_1, parent_2, start, end):
+    n_cities = len(parent_1)
+    child = [None] * n_cities
+    child[start:end] = parent_1[start:end]
+    segment = set(parent_1[start:end])
+    fill = [parent_2[(end + i) % n_cities] for i in range(n_cities)]
+    fill = [city for city in fill if city not in segment]
+    for i, city in enumerate(fill):
+        child[(end + i) % n_cities] = city
+    return child
+
+
+@pytest.mark.parametrize("n_cities", [2, 5, 12])
+def test_one_point_crossover_keeps_the_head_of_parent_1(n_cities):
+    parents_1, parents_2, rng = parent_pairs(50, n_cities)
+    cuts = rng.integers(1, n_cities, 50)
+    children = one_point_crossover(parents_1, parents_2, cuts)
+    assert_permutations(children, n_cities)
+    for child, parent_1, parent_2, cut in zip(children, parents_1, parents_2, cuts):
+        np.testing.assert_array_equal(child[:cut], parent_1[:cut])
+        assert child.tolist() == one_point_reference(parent_1.tolist(), parent_2.tolist(), cut)
+
+
+@pytest.mark.parametrize("n_cities", [2, 5, 12])
+def test_order_crossover_keeps_the_segment_of_parent_1(n_cities):
+    parents_1, parents_2, rng = parent_pairs(50, n_cities)
+    bounds = np.sort(rng.integers(0, n_cities + 1, (50, 2)), axis=1)
+    children = order_crossover(parents_1, parents_2, bounds[:, 0], bounds[:, 1])
+    assert_permutations(children, n_cities)
+    for child, parent_1, parent_2, (start, end) in zip(children, parents_1, parents_2, bounds):
+        np.testing.assert_array_equal(child[start:end], parent_1[start:end])
+        assert child.tolist() == order_reference(parent_1.tolist(), parent_2.tolist(), start, end)
+
+
+@pytest.mark.parametrize("method", ["one_point", "ox"])
+def test_crossover_offspring_are_permutations(method):
+    parents_1, parents_2, rng = parent_pairs(40, 30)
+    parents = np.empty((80, 30), dtype=parents_1.dtype)
+    parents[0::2], parents[1::2] = parents_1, parents_2
+    out = np.empty_like(parents)
+    children = crossover_offspring(parents, rng, method, out=out)
+    assert children is out and children.dtype == parents.dtype
+    assert_permutations(children, 30)
+
+
+def test_crossover_offspring_rejects_unknown_methods():
+    parents_1, parents_2, rng = parent_pairs(2, 5)
+    with pytest.raises(ValueError):
+        crossover_offspring(np.concatenate([parents_1, parents_2]), rng, "pmx")
@@ -0,0 +1,111 @@
+import numpy as np
+import pytest
+
+from fourier.engine import rfft_image
+from fourier.filters import FilterSpec, apply_gain, filter_gain, filtered_inverse, frequency_grid, shape_gain
+
+SHAPE = (48, 61)
+
+
+def radius(shape=SHAPE, center=(0.0, 0.0)):
+    # float64 distance of every half spectrum frequency to center
+    rows = np.fft.fftfreq(shape[0])[:, None]
+    cols = np.fft.rfftfreq(shape[1])[None, :]
+    return np.hypot(rows - center[0], cols - center[1])
+
+
+def lowpass(distance, cutoff, profile, order=2):
+    if profile == "ideal":
+        return (distance <= cutoff).astype(np.float64)
+    if profile == "gaussian":
+        return np.exp(-0.5 * (distance / cutoff) ** 2)
+    return 1 / (1 + (distance / cutoff) ** (2 * order))
+
+
+def test_frequency_grid_is_in_cycles_per_pixel():
+    rows, cols = frequency_grid(SHAPE)
+    assert rows.shape == (SHAPE[0], 1) and cols.shape == (1, SHAPE[1] // 2 + 1)
+    np.testing.assert_allclose(rows[:, 0], np.fft.fftfreq(SHAPE[0]), atol=1e-7)
+    np.testing.assert_allclose(cols[0], np.fft.rfftfreq(SHAPE[1]), atol=1e-7)
+
+
+@pytest.mark.parametrize("profile", ["ideal", "gaussian", "butterworth"])
+@pytest.mark.parametrize("order", [1, 3])
+def test_lowpass_and_highpass_gains(profile, order):
+    expected = lowpass(radius(), 0.1, profile, order)
+    low = filter_gain(FilterSpec("lowpass", profile, 0.1, order=order), SHAPE)
+    high = filter_gain(FilterSpec("highpass", profile, 0.1, order=order), SHAPE)
+    assert low.dtype == np.float32 and low.shape == (SHAPE[0], SHAPE[1] // 2 + 1)
+    np.testing.assert_allclose(low, expected, atol=1e-6)
+    np.testing.assert_allclose(high, 1 - expected, atol=1e-6)
+    assert low[0, 0] == 1 and high[0, 0] == 0
+
+
+def test_gains_at_the_cutoff():
+    # a frequency exactly on the cut-off: 1 cycle in 10 pixels
+    shape = (10, 10)
+    at_cutoff = (0, 1)
+    assert filter_gain(FilterSpec("lowpass", "ideal", 0.1), shape)[at_cutoff] == 1
+    assert filter_gain(FilterSpec("lowpass", "gaussian", 0.1), shape)[at_cutoff] == pytest.approx(np.exp(-0.5))
+    assert filter_gain(FilterSpec("lowpass", "butterworth", 0.1, order=4), shape)[at_cutoff] == pytest.approx(0.5)
+
+
+@pytest.mark.parametrize("profile", ["ideal", "gaussian", "butterworth"])
+def test_band_gains(profile):
+    band = lowpass(radius(), 0.3, profile) * (1 - lowpass(radius(), 0.1, profile))
+    np.testing.assert_allclose(filter_gain(FilterSpec("bandpass", profile, 0.1, 0.3), SHAPE), band, atol=1e-6)
+    np.testing.assert_allclose(filter_gain(FilterSpec("bandstop", profile, 0.1, 0.3), SHAPE), 1 - band, atol=1e-6)
+
+
+@pytest.mark.parametrize("profile", ["ideal", "gaussian", "butterworth"])
+def test_notch_gain_rejects_each_centre_and_its_mirror(profile):
+    # both centres fall on a frequency bin of a 48 x 64 image
+    shape = (48, 64)
+    centers = ((0.0, 0.25), (0.125, 0.125))
+    expected = np.ones((shape[0], shape[1] // 2 + 1))
+    for v, h in centers:
+        for sign in (1, -1):
+            expected *= 1 - lowpass(radius(shape, (sign * v, sign * h)), 0.02, profile)
+    gain = filter_gain(FilterSpec("notch", profile, 0.02, centers=centers), shape)
+    np.testing.assert_allclose(gain, expected, atol=1e-6)
+    assert gain[0, 16] == pytest.approx(0, abs=1e-6) and gain[6, 8] == pytest.approx(0, abs=1e-6)
+    assert gain[0, 0] == pytest.approx(1, abs=1e-3)
+
+
+def test_shape_gain_removes_masked_frequencies():
+    mask = np.zeros(SHAPE, dtype=np.uint8)
+    # the centred plane's zero frequency is at (height // 2, width // 2)
+    mask[SHAPE[0] // 2, SHAPE[1] // 2 + 3] = 255
+    gain = shape_gain(None, mask, SHAPE)
+    assert gain.dtype == np.float32
+    # horizontal frequency +3 and its mirror -3, which folds onto the same half spectrum column
+    assert gain[0, 3] == 0
+    assert np.count_nonzero(gain == 0) == 1
+    np.testing.assert_array_equal(shape_gain(None, None, SHAPE), np.ones_like(gain))
+
+
+def test_filtering_a_constant_image():
+    image = np.full(SHAPE + (3,), 100, dtype=np.uint8)
+    half = rfft_image(image)
+    low = filter_gain(FilterSpec("lowpass", "gaussian", 0.05), SHAPE)
+    high = filter_gain(FilterSpec("highpass", "gaussian", 0.05), SHAPE)
+    # all of a constant image's energy is at the zero frequency
+    np.testing.assert_array_equal(filtered_inverse(half, low, SHAPE[1]), image)
+    np.testing.assert_array_equal(filtered_inverse(half, high, SHAPE[1]), np.zeros_like(image))
+    # apply_gain works in place and broadcasts over the channels
+    assert apply_gain(half, low) is half
+
+
+@pytest.mark.parametrize("kwargs", [
+    dict(kind="smooth"),
+    dict(profile="box"),
+    dict(cutoff=0),
+    dict(kind="bandpass", high=0.05),
+    dict(kind="notch"),
+    dict(kind="notch", centers=((0.1,),)),
+])
+def test_filter_spec_rejects_bad_parameters(kwargs):
+    spec = dict(kind="lowpass", profile="ideal", cutoff=0.1)
+    spec.update(kwargs)
+    with pytest.raises(ValueError):
+        FilterSpec(**spec)
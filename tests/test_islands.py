@@ -0,0 +1,44 @@
+import numpy as np
+
+from ga.islands import migrate
+
+
+def island_populations(n_islands, n_population):
+    # every individual is a single gene holding its own unique id, and its
+    # cost is that id; later islands hold the cheaper individuals, so island
+    # i's best are (n_islands - 1 - i) * 100, ... + 1, ...
+    ids = (n_islands - 1 - np.arange(n_islands))[:, None] * 100 + np.arange(n_population)
+    return ids[..., None].copy(), ids.astype(np.float64)
+
+
+def test_full_topology_migrants_get_distinct_slots():
+    populations, costs = island_populations(4, 10)
+    migrate(populations, costs, 2, topology="full")
+    for target in range(4):
+        own = (3 - target) * 100
+        arrived = {int(gene) for gene in populations[target, :, 0]} - set(range(own, own + 10))
+        expected = {(3 - source) * 100 + rank for source in range(4) if source != target for rank in range(2)}
+        assert arrived == expected
+        # the target keeps its own best and its costs follow its individuals
+        assert {own, own + 1} <= set(populations[target, :, 0].tolist())
+        np.testing.assert_array_equal(costs[target], populations[target, :, 0])
+
+
+def test_best_migrants_win_when_slots_run_out():
+    populations, costs = island_populations(4, 4)
+    migrate(populations, costs, 1, topology="full")
+    # 3 migrants arrive at island 0 and 3 of its 4 slots can go; its own
+    # best is kept
+    assert sorted(populations[0, :, 0].tolist()) == [0, 100, 200, 300]
+    # with 2 free slots, the cheapest migrants win, not the first sources
+    populations, costs = island_populations(4, 3)
+    migrate(populations, costs, 1, topology="full")
+    assert sorted(populations[0, :, 0].tolist()) == [0, 100, 300]
+
+
+def test_ring_topology_sends_to_the_next_island():
+    populations, costs = island_populations(3, 5)
+    migrate(populations, costs, 1)
+    # island 0 holds ids 200.., island 1 100.., island 2 0..
+    assert sorted(populations[1, :, 0].tolist()) == [100, 101, 102, 103, 200]
+    assert sorted(populations[0, :, 0].tolist()) == [0, 200, 201, 202, 203]
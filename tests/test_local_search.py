@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+
+from ga.local_search import improve_tour, nearest_neighbours, or_opt, refine_elite, two_opt
+from ga.population import random_tours
+from ga.tour import distance_matrix, tour_lengths
+
+
+def random_problem(n_cities, seed=0):
+    rng = np.random.default_rng(seed)
+    dist = distance_matrix(rng.random((n_cities, 2)) * 100)
+    return dist, nearest_neighbours(dist), rng
+
+
+def assert_permutation(tour):
+    np.testing.assert_array_equal(np.sort(tour), np.arange(len(tour)))
+
+
+@pytest.mark.parametrize("search", [two_opt, or_opt, improve_tour])
+@pytest.mark.parametrize("n_cities", [4, 5, 12, 60])
+def test_local_search_never_lengthens_a_tour(search, n_cities):
+    dist, neighbours, rng = random_problem(n_cities)
+    for tour in random_tours(n_cities, 5, rng, unique=False):
+        before = tour_lengths(tour[None], dist)[0]
+        result = search(tour, dist, neighbours)
+        after = tour_lengths(tour[None], dist)[0]
+        assert_permutation(tour)
+        assert after <= before + 1e-9
+        # the searches report whether they found a shorter tour
+        if search is not improve_tour:
+            assert result == (after < before - 1e-9)
+
+
+def test_two_opt_removes_a_crossing():
+    # corners of a square visited across both diagonals
+    dist = distance_matrix([(0, 0), (1, 1), (1, 0), (0, 1)])
+    tour = np.array([0, 1, 2, 3])
+    assert two_opt(tour, dist, nearest_neighbours(dist))
+    assert tour_lengths(tour[None], dist)[0] == pytest.approx(4.0)
+
+
+def test_or_opt_moves_a_misplaced_city():
+    # city 0 belongs between 3 and 5 on the line but is visited first
+    coords = [(3.5, 0), (0, 0), (1, 0), (2, 0), (3, 0), (4, 0), (5, 0), (5, 1), (0, 1)]
+    dist = distance_matrix(coords)
+    tour = np.arange(len(coords))
+    before = tour_lengths(tour[None], dist)[0]
+    assert or_opt(tour, dist, nearest_neighbours(dist))
+    assert_permutation(tour)
+    assert tour_lengths(tour[None], dist)[0] < before
+
+
+def test_refine_elite_updates_known_lengths():
+    dist, neighbours, rng = random_problem(40)
+    tours = random_tours(40, 20, rng)
+    lengths = tour_lengths(tours, dist)
+    shortest = int(np.argmin(lengths))
+    refined = refine_elite(tours, dist, neighbours, n_elite=3, lengths=lengths)
+    assert shortest in refined
+    np.testing.assert_allclose(lengths, tour_lengths(tours, dist))
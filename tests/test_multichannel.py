@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+
+from ga.multichannel import ScheduleConstraints, _fixed_cells, count_violations, repair
+
+
+def violations(schedule, constraints):
+    # plain loops over one (channels, days, slots) schedule, independent of
+    # the vectorized conflicts()
+    n_channels = schedule.shape[0]
+    timeline = schedule.reshape(n_channels, -1)
+    found = []
+    for channel in range(n_channels):
+        for t in range(timeline.shape[1]):
+            for lag in range(1, constraints.min_gap):
+                if t + lag < timeline.shape[1] and timeline[channel, t] == timeline[channel, t + lag]:
+                    found.append(("gap", channel, t, lag))
+            if constraints.no_simultaneous:
+                for other in range(channel + 1, n_channels):
+                    if timeline[channel, t] == timeline[other, t]:
+                        found.append(("simultaneous", channel, other, t))
+    return found
+
+
+@pytest.mark.parametrize("min_gap, no_simultaneous", [(1, True), (3, False), (4, True), (10, True)])
+def test_repair_removes_every_violation(min_gap, no_simultaneous):
+    rng = np.random.default_rng(0)
+    constraints = ScheduleConstraints(min_gap, no_simultaneous=no_simultaneous)
+    # few programs, so random schedules start with many violations
+    schedules = rng.integers(0, 40, (20, 3, 2, 18))
+    assert count_violations(schedules, constraints).sum() > 0
+    repair(schedules, constraints, 40, rng, rounds=100)
+    assert not count_violations(schedules, constraints).any()
+    for schedule in schedules:
+        assert violations(schedule, constraints) == []
+    assert schedules.min() >= 0 and schedules.max() < 40
+
+
+def test_repair_keeps_fixed_cells():
+    rng = np.random.default_rng(1)
+    shape = (3, 2, 18)
+    # program 5 airs live twice on the first channel, 10 slots apart
+    constraints = ScheduleConstraints(4, {(0, 0, 10): 5, (0, 1, 2): 5, (2, 0, 0): 7})
+    fixed_mask, fixed_values = _fixed_cells(constraints, shape)
+    schedules = rng.integers(0, 40, (20,) + shape)
+    schedules[:, fixed_mask] = fixed_values[fixed_mask]
+    repair(schedules, constraints, 40, rng, rounds=100, fixed_mask=fixed_mask)
+    np.testing.assert_array_equal(schedules[:, fixed_mask], np.broadcast_to(fixed_values[fixed_mask], (20, 3)))
+    assert not count_violations(schedules, constraints).any()
+    for schedule in schedules:
+        assert violations(schedule, constraints) == []
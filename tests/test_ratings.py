@@ -0,0 +1,61 @@
+import os
+
+import numpy as np
+
+from ga.ratings import load_ratings
+
+HEADER = "Type of Program,Hour 6,Hour 7,Hour 8\n"
+
+
+def write_csv(path, rows, mtime_ns=None):
+    path.write_text(HEADER + "".join(f"{program},{','.join(ratings)}\n" for program, ratings in rows))
+    if mtime_ns is not None:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+    return os.stat(path)
+
+
+def test_second_load_is_memory_mapped(tmp_path):
+    csv_path = tmp_path / "ratings.csv"
+    write_csv(csv_path, [("news", ("0.1", "0.2", "0.3"))])
+    first = load_ratings(csv_path, [6, 7, 8])
+    assert not isinstance(first.matrix, np.memmap)
+    assert (tmp_path / "ratings.csv.npy").exists() and (tmp_path / "ratings.csv.json").exists()
+    second = load_ratings(csv_path, [6, 7, 8])
+    assert isinstance(second.matrix, np.memmap)
+    np.testing.assert_array_equal(second["news"], first["news"])
+
+
+def test_cache_is_invalidated_by_mtime(tmp_path):
+    csv_path = tmp_path / "ratings.csv"
+    stat = write_csv(csv_path, [("news", ("0.1", "0.2", "0.3"))])
+    load_ratings(csv_path)
+    # same size, newer mtime
+    write_csv(csv_path, [("news", ("0.9", "0.2", "0.3"))], mtime_ns=stat.st_mtime_ns + 10**9)
+    reloaded = load_ratings(csv_path)
+    assert not isinstance(reloaded.matrix, np.memmap)
+    np.testing.assert_allclose(reloaded["news"], [0.9, 0.2, 0.3])
+    assert isinstance(load_ratings(csv_path).matrix, np.memmap)
+
+
+def test_cache_is_invalidated_by_size(tmp_path):
+    csv_path = tmp_path / "ratings.csv"
+    stat = write_csv(csv_path, [("news", ("0.1", "0.2", "0.3"))])
+    load_ratings(csv_path)
+    # one more program, with the old mtime put back
+    write_csv(csv_path, [("news", ("0.1", "0.2", "0.3")), ("drama", ("0.4", "0.5", "0.6"))],
+              mtime_ns=stat.st_mtime_ns)
+    reloaded = load_ratings(csv_path)
+    assert not isinstance(reloaded.matrix, np.memmap)
+    assert list(reloaded) == ["news", "drama"]
+    np.testing.assert_allclose(reloaded["drama"], [0.4, 0.5, 0.6])
+
+
+def test_unchanged_stamp_keeps_the_cache(tmp_path):
+    csv_path = tmp_path / "ratings.csv"
+    stat = write_csv(csv_path, [("news", ("0.1", "0.2", "0.3"))])
+    load_ratings(csv_path)
+    # an edit that keeps both the size and the mtime is not noticed
+    write_csv(csv_path, [("news", ("0.9", "0.2", "0.3"))], mtime_ns=stat.st_mtime_ns)
+    cached = load_ratings(csv_path)
+    assert isinstance(cached.matrix, np.memmap)
+    np.testing.assert_allclose(cached["news"], [0.1, 0.2, 0.3])
@@ -0,0 +1,85 @@
+import itertools
+import random
+
+import numpy as np
+import pytest
+
+from ga.tv import (ALL_TIME_SLOTS, TVConfig, crossover_batch, genetic_algorithm, linear_assignment, mutate_batch,
+                   schedule_programs)
+
+
+def random_ratings(n_programs, n_slots, seed=0):
+    rng = np.random.default_rng(seed)
+    return {f"program_{i}": list(rng.random(n_slots)) for i in range(n_programs)}
+
+
+def test_ga_method_with_more_programs_than_slots():
+    ratings = random_ratings(30, len(ALL_TIME_SLOTS))
+    config = TVConfig(method="ga", population_size=20, generations=10, seed=0)
+    result = schedule_programs(ratings, config)
+    assert len(result.schedule) == len(ALL_TIME_SLOTS)
+    assert set(result.schedule) <= set(ratings)
+
+
+def test_initial_schedule_longer_than_slots_is_rejected():
+    ratings = random_ratings(30, len(ALL_TIME_SLOTS))
+    with pytest.raises(ValueError):
+        genetic_algorithm(list(ratings), ratings, 0.8, 0.2, random.Random(0), generations=1)
+
+
+@pytest.mark.parametrize("shape", [(1, 1), (3, 3), (5, 5), (4, 6), (3, 7)])
+@pytest.mark.parametrize("seed", range(5))
+def test_linear_assignment_matches_brute_force(shape, seed):
+    # small integer costs, so ties between assignments are common
+    cost = np.random.default_rng(seed).integers(0, 10, shape).astype(np.float64)
+    rows = np.arange(shape[0])
+    assignment = linear_assignment(cost)
+    assert len(set(assignment.tolist())) == shape[0]
+    assert assignment.min() >= 0 and assignment.max() < shape[1]
+    best = min(cost[rows, list(cols)].sum() for cols in itertools.permutations(range(shape[1]), shape[0]))
+    assert cost[rows, assignment].sum() == pytest.approx(best)
+
+
+def test_linear_assignment_needs_enough_columns():
+    with pytest.raises(ValueError):
+        linear_assignment(np.zeros((3, 2)))
+
+
+@pytest.mark.parametrize("crossover_rate", [0.0, 0.5, 1.0])
+def test_crossover_batch_children_are_one_point_crosses(crossover_rate):
+    rng = np.random.default_rng(0)
+    # disjoint program ranges, so every slot shows which parent it came from
+    parents1 = rng.integers(0, 5, (100, len(ALL_TIME_SLOTS)))
+    parents2 = rng.integers(5, 10, (100, len(ALL_TIME_SLOTS)))
+    children, crossed = crossover_batch(parents1, parents2, crossover_rate, rng)
+    first, second = children[:100], children[100:]
+    assert children.shape == (200, len(ALL_TIME_SLOTS))
+    from_first = first < 5
+    # a head from one parent and a tail from the other, mirrored in the second child
+    np.testing.assert_array_equal(first, np.where(from_first, parents1, parents2))
+    np.testing.assert_array_equal(second, np.where(from_first, parents2, parents1))
+    assert np.all(np.diff(from_first.astype(int), axis=1) <= 0)
+    # crossed pairs are cut inside the schedule, the others are copies
+    np.testing.assert_array_equal(crossed[:100], ~from_first.all(axis=1))
+    assert from_first[:, 0].all()
+    np.testing.assert_array_equal(crossed[:100], crossed[100:])
+    if crossover_rate == 0.0:
+        assert not crossed.any()
+    if crossover_rate == 1.0:
+        assert crossed.all()
+
+
+@pytest.mark.parametrize("mutation_rate", [0.0, 0.3, 1.0])
+def test_mutate_batch_changes_at_most_one_slot_per_child(mutation_rate):
+    rng = np.random.default_rng(1)
+    children = rng.integers(0, 10, (200, len(ALL_TIME_SLOTS)))
+    before = children.copy()
+    mutated = mutate_batch(children, mutation_rate, 10, rng)
+    changed = np.count_nonzero(children != before, axis=1)
+    assert children.min() >= 0 and children.max() < 10
+    assert not changed[~mutated].any()
+    assert changed.max() <= 1
+    if mutation_rate == 0.0:
+        assert not mutated.any()
+    if mutation_rate == 1.0:
+        assert mutated.all()